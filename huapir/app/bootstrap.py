@@ -12,6 +12,7 @@ from huapir.im.manager import IMManager
 from huapir.ioc.container import DependencyContainer
 from huapir.llm.llm_manager import LLMManager
 from huapir.llm.llm_registry import LLMBackendRegistry
+from huapir.llm.response_cache import LLMResponseCache
 from huapir.logger import get_logger
 from huapir.media import MediaManager
 from huapir.media.carrier import MediaCarrierRegistry, MediaCarrierService
@@ -31,6 +32,17 @@ from huapir.workflow.implementations.workflows import register_system_workflows
 logger = get_logger("Bootstrap")
 
 
+def install_uvloop():
+    """尝试把事件循环切换为 uvloop，未安装或平台不支持（如 Windows）时保持标准 asyncio"""
+    try:
+        import uvloop
+    except ImportError:
+        logger.debug("uvloop not available, using the default asyncio event loop")
+        return
+    uvloop.install()
+    logger.info("uvloop installed as the event loop policy")
+
+
 def init_container() -> DependencyContainer:
     container = DependencyContainer()
     container.register(DependencyContainer, container)
@@ -100,6 +112,7 @@ def register_core_services(container: DependencyContainer, config: GlobalConfig)
 
     container.register(IMRegistry, IMRegistry())
     container.register(LLMBackendRegistry, LLMBackendRegistry())
+    container.register(LLMResponseCache, LLMResponseCache())
     container.register(IMManager, IMManager(container))
     container.register(LLMManager, LLMManager(container))
     container.register(
@@ -113,6 +126,8 @@ def register_core_services(container: DependencyContainer, config: GlobalConfig)
 
 def init_application() -> DependencyContainer:
     logger.info("Initializing application...")
+    # 必须在任何事件循环创建之前安装，后续 new_event_loop 才会返回 uvloop 循环
+    install_uvloop()
     config = load_global_config()
     os.environ["TZ"] = config.system.timezone
     if hasattr(time, "tzset"):
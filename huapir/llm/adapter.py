@@ -18,6 +18,12 @@ class AutoDetectModelsProtocol(Protocol):
 class LLMChatProtocol(Protocol):
     def chat(self, req: LLMChatRequest) -> LLMChatResponse: ...
 
+@runtime_checkable
+class LLMChatBatchProtocol(Protocol):
+    def batch_chat(
+        self, req: LLMChatRequest, completion_window: str, poll_interval_s: int
+    ) -> LLMChatResponse: ...
+
 @runtime_checkable
 class LLMEmbeddingProtocol(Protocol):
     def embed(self, req: LLMEmbeddingRequest) -> LLMEmbeddingResponse: ...
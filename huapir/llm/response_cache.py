@@ -0,0 +1,54 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from huapir.llm.format.request import LLMChatRequest
+from huapir.llm.format.response import LLMChatResponse
+
+
+class LLMResponseCache:
+    """进程内的 LLM 响应缓存，按请求内容精确匹配。
+
+    键覆盖模型、完整消息、工具列表和 tool_choice，任何一项不同都视为
+    不同请求；命中时直接返回已存储的响应，省去一次模型调用。容量有限，
+    超出后按最久未使用淘汰。
+    """
+
+    def __init__(self, max_entries: int = 128):
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[str, LLMChatResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model_id: Optional[str], request: LLMChatRequest) -> str:
+        """根据请求内容计算缓存键"""
+        payload = json.dumps(
+            [
+                model_id,
+                [message.model_dump(mode="json") for message in request.messages],
+                [tool.model_dump(mode="json") for tool in request.tools]
+                if request.tools
+                else None,
+                request.tool_choice,
+            ],
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.blake2b(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[LLMChatResponse]:
+        with self._lock:
+            response = self._entries.get(key)
+            if response is not None:
+                self._entries.move_to_end(key)
+            return response
+
+    def put(self, key: str, response: LLMChatResponse):
+        with self._lock:
+            self._entries[key] = response
+            self._entries.move_to_end(key)
+            if len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
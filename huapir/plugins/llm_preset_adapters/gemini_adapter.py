@@ -1,6 +1,6 @@
 import asyncio
 import base64
-Any, Dict, Literal, cast
+from typing import Any, Dict, Literal, cast
 
 import aiohttp
 import requests
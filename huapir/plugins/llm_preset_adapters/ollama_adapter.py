@@ -1,5 +1,5 @@
 import asyncio
-Any, cast, Dict
+from typing import Any, cast, Dict
 
 import aiohttp
 import requests
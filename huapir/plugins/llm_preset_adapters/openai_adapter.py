@@ -1,6 +1,9 @@
 import asyncio
 import json
-Any, Dict, cast, Literal, TypedDict
+import time
+import uuid
+from io import BytesIO
+from typing import Any, Dict, cast, Literal, TypedDict
 
 import aiohttp
 import requests
@@ -8,7 +11,8 @@ from pydantic import BaseModel, ConfigDict
 
 import huapir.llm.format.tool as tools
 from huapir.config.global_config import ModelConfig
-from huapir.llm.adapter import AutoDetectModelsProtocol, LLMBackendAdapter, LLMChatProtocol, LLMEmbeddingProtocol
+from huapir.llm.adapter import (AutoDetectModelsProtocol, LLMBackendAdapter, LLMChatBatchProtocol, LLMChatProtocol,
+                                   LLMEmbeddingProtocol)
 from huapir.llm.format.message import (LLMChatContentPartType, LLMChatImageContent, LLMChatMessage,
                                           LLMChatTextContent, LLMToolCallContent, LLMToolResultContent)
 from huapir.llm.format.request import LLMChatRequest, Tool
@@ -104,19 +108,13 @@ class OpenAIConfig(BaseModel):
     model_config = ConfigDict(frozen=True)
 
 
-class OpenAIAdapterChatBase(LLMBackendAdapter, AutoDetectModelsProtocol, LLMChatProtocol):
+class OpenAIAdapterChatBase(LLMBackendAdapter, AutoDetectModelsProtocol, LLMChatProtocol, LLMChatBatchProtocol):
     media_manager: MediaManager
     
     def __init__(self, config: OpenAIConfig):
         self.config = config
-    @trace_llm_chat
-    def chat(self, req: LLMChatRequest) -> LLMChatResponse:
-        api_url = f"{self.config.api_base}/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {self.config.api_key}",
-            "Content-Type": "application/json",
-        }
-        
+    def _build_chat_body(self, req: LLMChatRequest) -> dict:
+        """构造 /chat/completions 请求体，None 字段会被剔除"""
         data = {
             "messages": asyncio.run(convert_llm_chat_message_to_openai_message(req.messages, self.media_manager)),
             "model": req.model,
@@ -137,19 +135,10 @@ class OpenAIAdapterChatBase(LLMBackendAdapter, AutoDetectModelsProtocol, LLMChat
         }
 
         # Remove None fields
-        data = {k: v for k, v in data.items() if v is not None}
-        
-        logger.debug(f"Request: {data}")
-
-        response = requests.post(api_url, json=data, headers=headers)
-        try:
-            response.raise_for_status()
-            response_data: dict = response.json()
-        except Exception as e:
-            logger.error(f"Response: {response.text}")
-            raise e
-        logger.debug(f"Response: {response_data}")
+        return {k: v for k, v in data.items() if v is not None}
 
+    def _parse_chat_response(self, req: LLMChatRequest, response_data: dict) -> LLMChatResponse:
+        """将 /chat/completions 的响应体转换为 LLMChatResponse"""
         choices: list[dict[str, Any]] = response_data.get("choices", [{}])
         first_choice = choices[0] if choices else {}
         message: dict[str, Any] = first_choice.get("message", {})
@@ -181,6 +170,102 @@ class OpenAIAdapterChatBase(LLMBackendAdapter, AutoDetectModelsProtocol, LLMChat
                 finish_reason=first_choice.get("finish_reason", ""),
             ),
         )
+
+    @trace_llm_chat
+    def chat(self, req: LLMChatRequest) -> LLMChatResponse:
+        api_url = f"{self.config.api_base}/chat/completions"
+        headers = {
+            "Authorization": f"Bearer {self.config.api_key}",
+            "Content-Type": "application/json",
+        }
+
+        data = self._build_chat_body(req)
+
+        logger.debug(f"Request: {data}")
+
+        response = requests.post(api_url, json=data, headers=headers)
+        try:
+            response.raise_for_status()
+            response_data: dict = response.json()
+        except Exception as e:
+            logger.error(f"Response: {response.text}")
+            raise e
+        logger.debug(f"Response: {response_data}")
+
+        return self._parse_chat_response(req, response_data)
+
+    def batch_chat(self, req: LLMChatRequest, completion_window: str = "24h",
+                   poll_interval_s: int = 30) -> LLMChatResponse:
+        """通过 Batch API 执行单个对话请求
+
+        请求以 JSONL 形式在内存中构造并上传（不落盘），随后轮询批处理
+        状态直到完成，再从输出文件中取回本次请求的结果。延迟从秒级换成
+        分钟到小时级，适合离线工作流，换取约一半的调用成本和更高的速率上限。
+        """
+        headers = {"Authorization": f"Bearer {self.config.api_key}"}
+        custom_id = f"huapir-{uuid.uuid4().hex}"
+        line = json.dumps({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": self._build_chat_body(req),
+        }, ensure_ascii=False)
+
+        upload = requests.post(
+            f"{self.config.api_base}/files",
+            headers=headers,
+            data={"purpose": "batch"},
+            files={"file": ("batch.jsonl", BytesIO(line.encode("utf-8")), "application/jsonl")},
+        )
+        try:
+            upload.raise_for_status()
+        except Exception as e:
+            logger.error(f"Response: {upload.text}")
+            raise e
+        input_file_id = upload.json()["id"]
+
+        created = requests.post(
+            f"{self.config.api_base}/batches",
+            headers={**headers, "Content-Type": "application/json"},
+            json={
+                "input_file_id": input_file_id,
+                "endpoint": "/v1/chat/completions",
+                "completion_window": completion_window,
+            },
+        )
+        try:
+            created.raise_for_status()
+        except Exception as e:
+            logger.error(f"Response: {created.text}")
+            raise e
+        batch_id = created.json()["id"]
+        logger.info(f"Batch {batch_id} created, polling every {poll_interval_s}s")
+
+        while True:
+            info = requests.get(f"{self.config.api_base}/batches/{batch_id}", headers=headers)
+            info.raise_for_status()
+            batch_info: dict = info.json()
+            status = batch_info.get("status")
+            if status == "completed":
+                break
+            if status in ("failed", "expired", "cancelled"):
+                raise RuntimeError(f"Batch {batch_id} ended with status: {status}")
+            time.sleep(poll_interval_s)
+
+        output_file_id = batch_info["output_file_id"]
+        output = requests.get(f"{self.config.api_base}/files/{output_file_id}/content", headers=headers)
+        output.raise_for_status()
+        for output_line in output.text.splitlines():
+            if not output_line.strip():
+                continue
+            record = json.loads(output_line)
+            if record.get("custom_id") != custom_id:
+                continue
+            if record.get("error"):
+                raise RuntimeError(f"Batch request failed: {record['error']}")
+            return self._parse_chat_response(req, record["response"]["body"])
+        raise RuntimeError(f"Batch {batch_id} output does not contain request {custom_id}")
+
     async def get_models(self) -> list[str]:
         api_url = f"{self.config.api_base}/models"
         async with aiohttp.ClientSession(trust_env=True) as session:
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict
-cast, TypedDict, Literal, Optional
+from typing import cast, TypedDict, Literal, Optional
 
 import requests
 import asyncio
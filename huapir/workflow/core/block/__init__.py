@@ -1,5 +1,6 @@
 from .base import Block, ConditionBlock, LoopBlock, LoopEndBlock
 from .input_output import Input, Output
+from .jit import jit_block
 from .param import ParamMeta
 from .registry import BlockRegistry
 from .schema import BlockConfig, BlockInput, BlockOutput
@@ -16,4 +17,5 @@ __all__ = [
     "ParamMeta",
     "Input",
     "Output",
+    "jit_block",
 ]
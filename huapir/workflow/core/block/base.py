@@ -15,7 +15,9 @@ class Block:
     inputs: dict[str, Input] = {}
     # block 的输出
     outputs: dict[str, Output] = {}
-    
+    # 是否是纯函数块：相同输入必然产生相同输出，可以被执行器缓存
+    memoizable: bool = False
+
     container: DependencyContainer
 
     def __init__(
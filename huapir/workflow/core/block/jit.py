@@ -0,0 +1,47 @@
+import warnings
+from typing import Any, Callable, Optional, Union
+
+# 只在首次降级时提示一次，避免每个被装饰的函数都发一条警告
+_numba_missing_warned = False
+
+
+def jit_block(
+    fn: Optional[Callable] = None,
+    *,
+    parallel: bool = False,
+    signature: Optional[Any] = None,
+) -> Union[Callable, Callable[[Callable], Callable]]:
+    """可选的 Numba JIT 装饰器，供数值密集的块加速其 execute 中的计算函数。
+
+    未安装 numba 时原样返回函数并降级为纯 Python 执行。已知参数类型时
+    建议显式传入 signature，编译会在装饰时完成而不是推迟到首次调用；
+    配合块上定义 _warmup 方法可以让 WorkflowBuilder.build 在构建阶段
+    触发编译，避免首次执行时的编译停顿。
+
+    用法::
+
+        @jit_block(signature="float64[:](float64[:])")
+        def _normalize(values): ...
+    """
+
+    def wrap(func: Callable) -> Callable:
+        global _numba_missing_warned
+        try:
+            import numba
+        except ImportError:
+            if not _numba_missing_warned:
+                warnings.warn(
+                    "numba is not installed; @jit_block falls back to plain Python",
+                    RuntimeWarning,
+                )
+                _numba_missing_warned = True
+            return func
+        if signature is not None:
+            return numba.njit(
+                signature, parallel=parallel, cache=True, boundscheck=False
+            )(func)
+        return numba.njit(parallel=parallel, cache=True, boundscheck=False)(func)
+
+    if fn is None:
+        return wrap
+    return wrap(fn)
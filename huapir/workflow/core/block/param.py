@@ -7,6 +7,8 @@ T = TypeVar("T")
 OptionsProvider = Callable[[DependencyContainer, Block], list[T]]
 
 class ParamMeta:
+    __slots__ = ("label", "description", "options_provider")
+
     def __init__(self, label: Optional[str] = None, description: Optional[str] = None, options_provider: Optional[OptionsProvider[T]] = None):
         self.label = label
         self.description = description
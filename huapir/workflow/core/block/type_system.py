@@ -1,13 +1,20 @@
 from inspect import Parameter
 from typing import Any, Dict, Optional, Type, Union, get_args, get_origin, overload
 
+# 无需注册的内置基础类型
+_PRIMITIVE_TYPES: frozenset = frozenset({str, int, float, bool, dict})
+
 
 class TypeSystem:
     """类型系统管理器，用于处理类型兼容性检查和类型名称映射"""
 
+    __slots__ = ("_type_map", "_compatibility_cache", "_origin_cache")
+
     def __init__(self) -> None:
         self._type_map: dict[str, Type] = {}
         self._compatibility_cache: dict[str, Dict[str, bool]] = {}
+        # 缓存 get_origin/get_args 的结果，键为注解本身，数量天然有限
+        self._origin_cache: dict[Any, tuple[Any, tuple]] = {}
 
     def register_type(self, type_name: str, type_class: Type):
         """注册一个类型到类型系统中"""
@@ -39,14 +46,12 @@ class TypeSystem:
             param_type = param.annotation
             required = True
             default = param.default if param.default != Parameter.empty else None
-            origin = get_origin(param_type)
         else:
             param_type = param
-            origin = get_origin(param_type)
             default = None
             required = True
+        origin, args = self._get_origin_and_args(param_type)
         if origin is Union:
-            args = get_args(param_type)
             if type(None) in args:
                 required = False
                 non_none_args = [arg for arg in args if arg is not type(None)]
@@ -57,7 +62,6 @@ class TypeSystem:
             else:
                 type_name = f"Union[{', '.join(self.get_type_name(arg) for arg in args)}]"
         elif origin is list:
-            args = get_args(param_type)
             if args:
                 element_type = args[0]
                 element_type_name = self.get_type_name(element_type)
@@ -68,11 +72,19 @@ class TypeSystem:
             type_name = self.get_type_name(param_type)
 
         # 注册类型
-        if param_type not in (str, int, float, bool, dict) or origin is not list:
+        if param_type not in _PRIMITIVE_TYPES and origin is not list:
             self.register_type(type_name, param_type)
 
         return type_name, required, default
 
+    def _get_origin_and_args(self, param_type: Any) -> tuple[Any, tuple]:
+        """获取注解的 origin 和 args，重复出现的注解直接走缓存"""
+        cached = self._origin_cache.get(param_type)
+        if cached is None:
+            cached = (get_origin(param_type), get_args(param_type))
+            self._origin_cache[param_type] = cached
+        return cached
+
     def is_compatible(self, source_type: str, target_type: str) -> bool:
         """检查源类型是否可以赋值给目标类型"""
         # 检查缓存
@@ -108,17 +120,15 @@ class TypeSystem:
 
     def get_compatibility_map(self) -> dict[str, Dict[str, bool]]:
         """获取所有已注册类型之间的兼容性映射"""
-        # 确保所有类型组合都已经计算过
-        all_types = list(self._type_map.keys())
+        # 单次遍历，只构建可兼容的条目，避免先全量计算再过滤的双份分配
+        result: dict[str, Dict[str, bool]] = {}
+        all_types = list(self._type_map)
+        is_compatible = self.is_compatible
         for source_type in all_types:
+            row: Dict[str, bool] = {}
             for target_type in all_types:
-                self.is_compatible(source_type, target_type)
-        # 只保留可兼容的结果
-        return {
-            source_type: {
-                target_type: is_compatible
-                for target_type, is_compatible in compatibility.items()
-                if is_compatible
-            }
-            for source_type, compatibility in self._compatibility_cache.items()
-        }
+                if is_compatible(source_type, target_type):
+                    row[target_type] = True
+            if row:
+                result[source_type] = row
+        return result
@@ -16,7 +16,8 @@ from huapir.workflow.core.execution.executor import WorkflowExecutor
 from huapir.workflow.core.workflow.base import Workflow
 from huapir.workflow.core.workflow.registry import WorkflowRegistry
 
-from .exceptions import WorkflowNotFoundException
+# 共享的空字典，避免 raw_metadata 为 None 时每次都新建一个
+_EMPTY_METADATA: dict = {}
 
 
 class WorkflowDispatcher:
@@ -38,17 +39,17 @@ class WorkflowDispatcher:
         return 128
 
     def _resolve_tenant_id(self, message: IMMessage) -> str:
+        sender = message.sender
+        tenant_id = (sender.raw_metadata or _EMPTY_METADATA).get("tenant_id")
+        if tenant_id:
+            return str(tenant_id)
+
         if self.container.has(GlobalConfig):
             config = self.container.resolve(GlobalConfig)
             default_tenant_id = config.tenant.default_tenant_id
         else:
             default_tenant_id = "default"
 
-        sender = message.sender
-        metadata = sender.raw_metadata or {}
-        if "tenant_id" in metadata and metadata["tenant_id"]:
-            return str(metadata["tenant_id"])
-
         if self.container.has(TenantService):
             tenant_service = self.container.resolve(TenantService)
             tenant_id = tenant_service.resolve_tenant_for_user(sender.user_id)
@@ -74,25 +75,40 @@ class WorkflowDispatcher:
                 with use_tenant_context(tenant_id=tenant_id, user_id=message.sender.user_id):
                     active_rules = self.dispatch_registry.get_active_rules()
                     for rule in active_rules:
-                        if rule.match(message, self.workflow_registry, scoped_container):
-                            scoped_container.register(DispatchRule, rule)
-                            metrics_registry.inc("workflow_dispatches_total")
-                            try:
-                                self.logger.debug(f"Matched rule {rule}, executing workflow")
-                                workflow = rule.get_workflow(scoped_container)
-                                if workflow is None:
-                                    raise WorkflowNotFoundException(f"Workflow for rule {rule.name} not found, please check the rule configuration")
-                                scoped_container.register(Workflow, workflow)
-                                executor = WorkflowExecutor(scoped_container)
-                                scoped_container.register(WorkflowExecutor, executor)
-                                return await executor.run()
-                            except WorkflowExecutionTimeoutException as e:
-                                metrics_registry.inc("workflow_dispatch_failures_total")
-                                self.logger.error(f"Workflow execution timed out: {e}")
-                                return None
-                            except Exception as e:
-                                metrics_registry.inc("workflow_dispatch_failures_total")
-                                self.logger.opt(exception=e).error(f"Workflow execution failed: {e}")
-                                return None
+                        # 兜底规则必然匹配，跳过 match 调用即可；
+                        # 仍按注册表的优先级顺序取首个命中的规则
+                        if rule.is_fallback() or rule.match(message, self.workflow_registry, scoped_container):
+                            return await self._execute_rule(rule, scoped_container)
                     self.logger.debug("No matching rule found for message")
                     return None
+
+    async def _execute_rule(self, rule: CombinedDispatchRule, scoped_container: DependencyContainer):
+        """执行匹配规则对应的工作流"""
+        scoped_container.register(DispatchRule, rule)
+        metrics_registry.inc("workflow_dispatches_total")
+        self.logger.debug(f"Matched rule {rule}, executing workflow")
+        # 工作流构建（块实例化、连线检查）可能因配置错误抛出异常，
+        # 与执行失败一样记录日志并计数，不让异常逃出 dispatch()
+        try:
+            workflow = rule.get_workflow(scoped_container)
+            if workflow is None:
+                metrics_registry.inc("workflow_dispatch_failures_total")
+                self.logger.error(f"Workflow for rule {rule.name} not found, please check the rule configuration")
+                return None
+            scoped_container.register(Workflow, workflow)
+            executor = WorkflowExecutor(scoped_container)
+            scoped_container.register(WorkflowExecutor, executor)
+        except Exception as e:
+            metrics_registry.inc("workflow_dispatch_failures_total")
+            self.logger.opt(exception=e).error(f"Failed to construct workflow for rule {rule.name}: {e}")
+            return None
+        try:
+            return await executor.run()
+        except WorkflowExecutionTimeoutException as e:
+            metrics_registry.inc("workflow_dispatch_failures_total")
+            self.logger.error(f"Workflow execution timed out: {e}")
+            return None
+        except Exception as e:
+            metrics_registry.inc("workflow_dispatch_failures_total")
+            self.logger.opt(exception=e).error(f"Workflow execution failed: {e}")
+            return None
@@ -31,6 +31,12 @@ class CombinedDispatchRule(BaseModel):
     rule_groups: list[RuleGroup]  # 规则组之间是 AND 关系
     metadata: dict[str, Any] = {}
 
+    def is_fallback(self) -> bool:
+        """判断该规则是否是兜底规则（即所有子规则都是 fallback 类型，必然匹配）"""
+        return all(
+            rule.type == "fallback" for group in self.rule_groups for rule in group.rules
+        )
+
     def match(self, message: IMMessage, workflow_registry: WorkflowRegistry, container: DependencyContainer) -> bool:
         """
         判断消息是否匹配该规则。
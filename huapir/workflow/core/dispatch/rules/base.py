@@ -22,6 +22,18 @@ class DispatchRule(ABC):
     config_class: ClassVar[Type[RuleConfig]]
     type_name: ClassVar[str]
 
+    # 规则实例数量可能很多，使用 __slots__ 减少每个实例的内存开销
+    __slots__ = (
+        "workflow_registry",
+        "rule_id",
+        "name",
+        "description",
+        "priority",
+        "enabled",
+        "metadata",
+        "workflow_id",
+    )
+
     def __init__(self, workflow_registry: WorkflowRegistry, workflow_id: str):
         """初始化调度规则。"""
         self.workflow_registry = workflow_registry
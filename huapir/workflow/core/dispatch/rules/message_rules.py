@@ -20,6 +20,8 @@ class RegexMatchRule(DispatchRule):
     config_class = RegexRuleConfig
     type_name = "regex"
 
+    __slots__ = ("pattern",)
+
     def __init__(self, pattern: str, workflow_registry: WorkflowRegistry, workflow_id: str):
         super().__init__(workflow_registry, workflow_id)
         self.pattern = re.compile(pattern)
@@ -43,6 +45,8 @@ class PrefixMatchRule(DispatchRule):
     config_class = PrefixRuleConfig
     type_name = "prefix"
 
+    __slots__ = ("prefix",)
+
     def __init__(self, prefix: str, workflow_registry: WorkflowRegistry, workflow_id: str):
         super().__init__(workflow_registry, workflow_id)
         self.prefix = prefix
@@ -74,6 +78,8 @@ class KeywordMatchRule(DispatchRule):
     config_class = KeywordRuleConfig
     type_name = "keyword"
 
+    __slots__ = ("keywords",)
+
     def __init__(self, keywords: list[str], workflow_registry: WorkflowRegistry, workflow_id: str):
         super().__init__(workflow_registry, workflow_id)
         self.keywords = keywords
@@ -93,6 +99,8 @@ class BotMentionMatchRule(DispatchRule):
     config_class = RuleConfig
     type_name = "bot_mention"
 
+    __slots__ = ()
+
     def __init__(self, workflow_registry: WorkflowRegistry, workflow_id: str):
         super().__init__(workflow_registry, workflow_id)
 
@@ -22,6 +22,8 @@ class ChatSenderMatchRule(DispatchRule):
     config_class = ChatSenderMatchRuleConfig
     type_name = "sender"
 
+    __slots__ = ("sender_id", "sender_group")
+
     def __init__(
         self,
         sender_id: Optional[str],
@@ -63,6 +65,8 @@ class ChatSenderMismatchRule(DispatchRule):
     config_class = ChatSenderMatchRuleConfig
     type_name = "sender_mismatch"
 
+    __slots__ = ("sender_id", "sender_group")
+
     def __init__(
         self,
         sender_id: Optional[str],
@@ -110,6 +114,8 @@ class ChatTypeMatchRule(DispatchRule):
     config_class = ChatTypeMatchRuleConfig
     type_name = "chat_type"
 
+    __slots__ = ("chat_type",)
+
     def __init__(self, chat_type: ChatType, workflow_registry: WorkflowRegistry, workflow_id: str):
         super().__init__(workflow_registry, workflow_id)
         self.chat_type = chat_type
@@ -22,13 +22,13 @@ class RandomChanceMatchRule(DispatchRule):
     config_class = RandomChanceRuleConfig
     type_name = "random"
 
+    __slots__ = ("chance",)
+
     def __init__(self, chance: int, workflow_registry: WorkflowRegistry, workflow_id: str):
         super().__init__(workflow_registry, workflow_id)
         self.chance = chance
 
     def match(self, message: IMMessage, container: DependencyContainer) -> bool:
-        print(f"Random chance: {self.chance}")
-        print(f"Random number: {random.random()}")
         return random.random() * 100 < self.chance
 
     def get_config(self) -> RandomChanceRuleConfig:
@@ -49,6 +49,8 @@ class IMInstanceMatchRule(DispatchRule):
     config_class = IMInstanceMatchRuleConfig
     type_name = "im_instance"
 
+    __slots__ = ("im_instance",)
+
     def __init__(self, im_instance: str, workflow_registry: WorkflowRegistry, workflow_id: str):
         super().__init__(workflow_registry, workflow_id)
         self.im_instance = im_instance
@@ -73,6 +75,8 @@ class FallbackMatchRule(DispatchRule):
     config_class = RuleConfig
     type_name = "fallback"
 
+    __slots__ = ()
+
     def __init__(self, workflow_registry: WorkflowRegistry, workflow_id: str):
         super().__init__(workflow_registry, workflow_id)
         self.priority = 0  # 兜底规则优先级最低
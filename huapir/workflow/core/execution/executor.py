@@ -1,8 +1,13 @@
 import asyncio
-import functools
-from collections import defaultdict
-from concurrent.futures import ThreadPoolExecutor
-from dataclasses import dataclass
+import hashlib
+import json
+import pickle
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from copy import copy
+from itertools import count
+from types import MappingProxyType
 from typing import Any, Dict
 
 from huapir.config.global_config import GlobalConfig
@@ -18,11 +23,100 @@ from huapir.workflow.core.execution.exceptions import (BlockExecutionFailedExcep
 from huapir.workflow.core.workflow import Workflow
 
 
-@dataclass
+# 结果缓存最多保留的条目数，超出后按插入顺序淘汰
+_MEMO_CACHE_MAX_ENTRIES = 256
+
+# 按 (io_workers, cpu_workers) 共享的线程池，避免每次 run() 都重建并销毁线程
+_shared_pools: dict[tuple[int, int], tuple[ThreadPoolExecutor, ThreadPoolExecutor]] = {}
+# CPU 块的共享进程池，按需创建：线程受 GIL 限制，纯 Python 计算只有跨进程才能并行
+_shared_process_pools: dict[int, ProcessPoolExecutor] = {}
+_shared_pools_lock = threading.Lock()
+
+# 自身或输入无法 pickle 的块类型（如持有容器或闭包的块），记住后直接走线程池
+_process_unsafe_block_types: set[type] = set()
+
+
+def _invoke_block(block: "Block", inputs: dict) -> dict:
+    """进程池的入口函数，在子进程中调用块的 execute"""
+    return block.execute(**inputs)
+
+
 class WorkflowExecutionMetrics:
-    submitted: int = 0
-    completed: int = 0
-    failed: int = 0
+    """
+    执行计数器。自增走 itertools.count 的 C 级 next()，
+    比纯 Python 的属性读-改-写更便宜；读取时拷贝迭代器取快照。
+    """
+
+    __slots__ = ("_submitted", "_completed", "_failed")
+
+    def __init__(self):
+        self._submitted = count()
+        self._completed = count()
+        self._failed = count()
+
+    def inc_submitted(self):
+        next(self._submitted)
+
+    def inc_completed(self):
+        next(self._completed)
+
+    def inc_failed(self):
+        next(self._failed)
+
+    @property
+    def submitted(self) -> int:
+        return next(copy(self._submitted))
+
+    @property
+    def completed(self) -> int:
+        return next(copy(self._completed))
+
+    @property
+    def failed(self) -> int:
+        return next(copy(self._failed))
+
+
+class _FastSemaphore:
+    """
+    轻量级信号量：未达到并发上限时只做一次计数器自增，
+    仅在饱和时才分配 Future 挂起等待，避免每个块执行都付出
+    asyncio.Semaphore 的 Future 开销。
+    """
+
+    __slots__ = ("_limit", "_count", "_waiters")
+
+    def __init__(self, limit: int):
+        self._limit = limit
+        self._count = 0
+        self._waiters: deque = deque()
+
+    async def __aenter__(self):
+        if self._count < self._limit:
+            self._count += 1
+            return self
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            # 名额由释放方直接移交，计数不再变动
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # 名额已经移交给我们但协程被取消，转交给下一个等待者
+                self._release()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self._release()
+        return False
+
+    def _release(self):
+        while self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)
+                return
+        self._count -= 1
 
 
 class WorkflowExecutor:
@@ -40,10 +134,19 @@ class WorkflowExecutor:
         self.workflow = workflow
         self.registry = registry
         self.event_bus = event_bus
-        self.results: dict[str, Any] = {}
+        # 以块对象身份作键，就绪检查和输入收集不再反复做字符串哈希
+        self.results: dict[Block, dict[str, Any]] = {}
         self.variables: dict[str, Any] = {}  # 存储工作流变量
         self.metrics = WorkflowExecutionMetrics()
-        self._global_semaphore = asyncio.Semaphore(self._get_workflow_max_concurrency())
+        self._global_semaphore = _FastSemaphore(self._get_workflow_max_concurrency())
+        # 结果缓存跨 run() 调用存活，键为 (块名, 块id, 输入哈希)
+        self._memoization_enabled = workflow.config.enable_memoization
+        self.memo_cache: dict[bytes, dict[str, Any]] = {}
+        # 已被某个任务认领执行的块，防止汇聚节点被并发调度两次
+        self._in_flight: set[str] = set()
+        # 每个块尚未完成的前驱数量，run() 开始时由 _predecessors 重置
+        self._pending_preds: dict[Block, int] = {}
+        self._io_executor, self._cpu_executor = self._get_shared_executors()
         self.logger.info(
             f"Initializing WorkflowExecutor for workflow '{workflow.name}'"
         )
@@ -73,19 +176,64 @@ class WorkflowExecutor:
             return None
         return fallback_timeout
 
-    def _build_executors(self):
+    def _get_shared_executors(self):
+        system_config = self._get_system_config()
+        if system_config is None:
+            io_workers, cpu_workers = 16, 4
+        else:
+            io_workers = max(1, system_config.workflow_io_workers)
+            cpu_workers = max(1, system_config.workflow_cpu_workers)
+        key = (io_workers, cpu_workers)
+        with _shared_pools_lock:
+            pools = _shared_pools.get(key)
+            if pools is None:
+                pools = (
+                    ThreadPoolExecutor(max_workers=io_workers),
+                    ThreadPoolExecutor(max_workers=cpu_workers),
+                )
+                _shared_pools[key] = pools
+        return pools
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
         system_config = self._get_system_config()
         if system_config is None:
-            return ThreadPoolExecutor(max_workers=16), ThreadPoolExecutor(max_workers=4)
-        io_workers = max(1, system_config.workflow_io_workers)
-        cpu_workers = max(1, system_config.workflow_cpu_workers)
-        return ThreadPoolExecutor(max_workers=io_workers), ThreadPoolExecutor(max_workers=cpu_workers)
+            cpu_workers = 4
+        else:
+            cpu_workers = max(1, system_config.workflow_cpu_workers)
+        with _shared_pools_lock:
+            pool = _shared_process_pools.get(cpu_workers)
+            if pool is None:
+                pool = ProcessPoolExecutor(max_workers=cpu_workers)
+                _shared_process_pools[cpu_workers] = pool
+        return pool
 
     def _build_execution_graph(self):
         """构建执行图，包含并行和条件逻辑"""
+        # 同一个 Workflow 对象重复执行时，直接复用已编译并验证过的执行图
+        workflow = self.workflow
+        if (
+            workflow._compiled_graph is not None
+            and workflow._compiled_graph_version == workflow._graph_version
+        ):
+            (
+                self.execution_graph,
+                self._predecessors,
+                self._input_wire_map,
+                self._condition_branches,
+            ) = workflow._compiled_graph
+            return
+
         self.execution_graph = defaultdict(list)
+        # 预先建立前驱集合与输入连线映射，让就绪检查和输入收集都是 O(1) 查表
+        self._predecessors: dict[Block, set[Block]] = defaultdict(set)
+        self._input_wire_map: dict[Block, dict[str, Any]] = defaultdict(dict)
         # self.logger.debug("Building execution graph...")
 
+        # 同一工作流往往只用到少数几种类型，按类型名对缓存兼容性判断结果
+        get_type_name = self.registry._type_system.get_type_name
+        is_type_compatible = self.registry.is_type_compatible
+        compat_cache: dict[tuple[str, str], bool] = {}
+
         for wire in self.workflow.wires:
             # self.logger.debug(f"Processing wire: {wire.source_block.name}.{wire.source_output} -> "
             #                  f"{wire.target_block.name}.{wire.target_input}")
@@ -93,12 +241,17 @@ class WorkflowExecutor:
             # 验证连线的数据类型是否匹配
             source_output = wire.source_block.outputs[wire.source_output]
             target_input = wire.target_block.inputs[wire.target_input]
-            
+
             # 使用 BlockRegistry 的类型系统进行类型兼容性检查
-            source_type = self.registry._type_system.get_type_name(source_output.data_type)
-            target_type = self.registry._type_system.get_type_name(target_input.data_type)
-            
-            if not self.registry.is_type_compatible(source_type, target_type):
+            source_type = get_type_name(source_output.data_type)
+            target_type = get_type_name(target_input.data_type)
+
+            key = (source_type, target_type)
+            compatible = compat_cache.get(key)
+            if compatible is None:
+                compatible = is_type_compatible(source_type, target_type)
+                compat_cache[key] = compatible
+            if not compatible:
                 error_msg = (
                     f"Type mismatch in wire: {wire.source_block.name}.{wire.source_output} "
                     f"({source_type}) -> {wire.target_block.name}.{wire.target_input} "
@@ -109,7 +262,33 @@ class WorkflowExecutor:
                 
             # 将目标块添加到源块的执行图中
             self.execution_graph[wire.source_block].append(wire.target_block)
+            self._predecessors[wire.target_block].add(wire.source_block)
+            self._input_wire_map[wire.target_block][wire.target_input] = wire
             # self.logger.debug(f"Added edge: {wire.source_block.name} -> {wire.target_block.name}")
+
+        # 构建完成后冻结各映射：前驱集合转 frozenset，输入连线表转只读视图
+        self._predecessors = {
+            block: frozenset(preds) for block, preds in self._predecessors.items()
+        }
+        self._input_wire_map = {
+            block: MappingProxyType(wires) for block, wires in self._input_wire_map.items()
+        }
+        # 条件块的 then/else 分支提前定型，执行时省去列表索引和长度判断
+        self._condition_branches = {}
+        for candidate in workflow.blocks:
+            if isinstance(candidate, ConditionBlock):
+                successors = self.execution_graph[candidate]
+                then_block = successors[0] if successors else None
+                else_block = successors[1] if len(successors) > 1 else None
+                self._condition_branches[candidate] = (then_block, else_block)
+        workflow._compiled_graph = (
+            self.execution_graph,
+            self._predecessors,
+            self._input_wire_map,
+            self._condition_branches,
+        )
+        workflow._compiled_graph_version = workflow._graph_version
+
     async def run(self) -> dict[str, Any]:
         """
         执行工作流，返回每个块的执行结果。
@@ -117,182 +296,289 @@ class WorkflowExecutor:
         :return: 包含每个块执行结果的字典，键为块名，值为块的输出
         """
         from huapir.events import WorkflowExecutionBegin, WorkflowExecutionEnd
-        self.event_bus.post(WorkflowExecutionBegin(self.workflow, self))
-        self.logger.info("Starting workflow execution")
         loop = asyncio.get_running_loop()
+        # 生命周期事件通过 call_soon 异步投递，订阅者的耗时不计入工作流关键路径
+        post = self.event_bus.post
+        loop.call_soon(post, WorkflowExecutionBegin(self.workflow, self))
+        self.logger.info("Starting workflow execution")
         max_timeout = self._resolve_timeout()
-        io_executor, cpu_executor = self._build_executors()
-        with io_executor, cpu_executor:
-            # 从入口节点开始执行
-            entry_blocks = [block for block in self.workflow.blocks if not block.inputs]
-            # self.logger.debug(f"Identified entry blocks: {[b.name for b in entry_blocks]}")
-            try:
-                async with asyncio.timeout(max_timeout): # type: ignore
-                    await self._execute_nodes(entry_blocks, io_executor, cpu_executor, loop)
-            except asyncio.TimeoutError as e:
-                metrics_registry.inc("workflow_runs_failed_total")
-                self.event_bus.post(WorkflowExecutionEnd(self.workflow, self, self.results))
-                raise WorkflowExecutionTimeoutException(f"Workflow execution timed out after {max_timeout} seconds") from e
-            except Exception:
-                metrics_registry.inc("workflow_runs_failed_total")
-                self.event_bus.post(WorkflowExecutionEnd(self.workflow, self, self.results))
-                raise
+        # 重置剩余前驱计数，作为就绪检查的 O(1) 快速闸门
+        self._pending_preds = {
+            block: len(preds) for block, preds in self._predecessors.items()
+        }
+        # 从入口节点开始执行
+        entry_blocks = [block for block in self.workflow.blocks if not block.inputs]
+        # self.logger.debug(f"Identified entry blocks: {[b.name for b in entry_blocks]}")
+        try:
+            async with asyncio.timeout(max_timeout): # type: ignore
+                await self._execute_nodes(entry_blocks, loop)
+        except asyncio.TimeoutError as e:
+            metrics_registry.inc("workflow_runs_failed_total")
+            loop.call_soon(post, WorkflowExecutionEnd(self.workflow, self, self.results_by_name))
+            raise WorkflowExecutionTimeoutException(f"Workflow execution timed out after {max_timeout} seconds") from e
+        except Exception:
+            metrics_registry.inc("workflow_runs_failed_total")
+            loop.call_soon(post, WorkflowExecutionEnd(self.workflow, self, self.results_by_name))
+            raise
 
         metrics_registry.inc("workflow_runs_success_total")
         self.logger.info("Workflow execution completed")
-        self.event_bus.post(WorkflowExecutionEnd(self.workflow, self, self.results))
-        return self.results
-
-    async def _execute_nodes(self, blocks: list[Block], io_executor, cpu_executor, loop):
-        """执行一组节点"""
-        # self.logger.debug(f"Executing node group: {[b.name for b in blocks]}")
-
-        for block in blocks:
-            # self.logger.debug(f"Processing block: {block.name} ({type(block).__name__})")
-            if isinstance(block, ConditionBlock):
-                await self._execute_conditional_branch(block, io_executor, cpu_executor, loop)
-            elif isinstance(block, LoopBlock):
-                await self._execute_loop(block, io_executor, cpu_executor, loop)
-            else:
-                await self._execute_normal_block(block, io_executor, cpu_executor, loop)
+        results_by_name = self.results_by_name
+        loop.call_soon(post, WorkflowExecutionEnd(self.workflow, self, results_by_name))
+        return results_by_name
+
+    @property
+    def results_by_name(self) -> dict[str, Any]:
+        """以块名为键的结果视图，供执行器外部的消费方使用"""
+        return {block.name: result for block, result in self.results.items()}
+
+    async def _execute_nodes(self, blocks: list[Block], loop):
+        """
+        以就绪驱动的方式并发执行一组节点及其后继。
+
+        每个就绪的块作为独立任务提交，块完成后把它的后继重新交给调度器，
+        兄弟分支因此可以真正并行执行；TaskGroup 保证出错时整组结构化取消。
+        """
+        async with asyncio.TaskGroup() as task_group:
+            def spawn(block: Block):
+                # self.logger.debug(f"Scheduling block: {block.name} ({type(block).__name__})")
+                if isinstance(block, ConditionBlock):
+                    task_group.create_task(self._execute_conditional_branch(block, spawn, loop))
+                elif isinstance(block, LoopBlock):
+                    task_group.create_task(self._execute_loop(block, spawn, loop))
+                else:
+                    task_group.create_task(self._execute_normal_block(block, spawn, loop))
+
+            for block in blocks:
+                spawn(block)
+
+    def _memo_key(self, block: Block, inputs: dict[str, Any]) -> bytes | None:
+        """计算块执行结果的缓存键，输入无法规范化序列化时返回 None"""
+        try:
+            canonical_inputs = json.dumps(inputs, sort_keys=True, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return None
+        # 多数实现块不调用 super().__init__()，实例上没有 id 属性，退回类名
+        block_id = getattr(block, "id", type(block).__qualname__)
+        return hashlib.blake2b(
+            f"{block.name}|{block_id}|{canonical_inputs}".encode()
+        ).digest()
+
+    async def _execute_block(self, block: Block, inputs: dict[str, Any], loop):
+        memo_key = None
+        if self._memoization_enabled and block.memoizable:
+            memo_key = self._memo_key(block, inputs)
+            if memo_key is not None and memo_key in self.memo_cache:
+                return self.memo_cache[memo_key]
+
+        # 提供 execute_async 的块直接在事件循环内 await，不经过线程池
+        execute_async = getattr(block, "execute_async", None)
+        if execute_async is not None:
+            self.metrics.inc_submitted()
+            async with self._global_semaphore:
+                result = await execute_async(**inputs)
+            if memo_key is not None:
+                if len(self.memo_cache) >= _MEMO_CACHE_MAX_ENTRIES:
+                    self.memo_cache.pop(next(iter(self.memo_cache)))
+                self.memo_cache[memo_key] = result
+            return result
 
-    async def _execute_block(self, block: Block, inputs: dict[str, Any], io_executor, cpu_executor, loop):
         execution_mode = getattr(block, "execution_mode", "io")
-        executor = cpu_executor if execution_mode == "cpu" else io_executor
-        self.metrics.submitted += 1
+        if execution_mode == "cpu" and type(block) not in _process_unsafe_block_types:
+            # CPU 密集的块交给进程池绕开 GIL；"cpu_threaded" 显式保留线程池语义
+            executor = None
+        elif execution_mode in ("cpu", "cpu_threaded"):
+            executor = self._cpu_executor
+        else:
+            executor = self._io_executor
+        if executor is None:
+            # 提交前先探测可序列化性，而不是捕获提交后的异常：
+            # 块自身执行抛出的 TypeError/AttributeError 不应被误判为
+            # "不可序列化"而静默换池重跑（已发生的副作用会被执行两次）
+            try:
+                pickle.dumps((block, inputs))
+            except (pickle.PicklingError, TypeError, AttributeError):
+                # 块带着不可序列化的状态（容器、闭包等），回退到 CPU 线程池
+                _process_unsafe_block_types.add(type(block))
+                self.logger.warning(
+                    f"Block {block.name} is not picklable, falling back to the CPU thread pool"
+                )
+                executor = self._cpu_executor
+        self.metrics.inc_submitted()
         async with self._global_semaphore:
-            return await loop.run_in_executor(executor, functools.partial(block.execute, **inputs))
+            if executor is not None:
+                result = await loop.run_in_executor(executor, lambda: block.execute(**inputs))
+            else:
+                result = await loop.run_in_executor(
+                    self._get_process_pool(), _invoke_block, block, inputs
+                )
+
+        if memo_key is not None:
+            if len(self.memo_cache) >= _MEMO_CACHE_MAX_ENTRIES:
+                self.memo_cache.pop(next(iter(self.memo_cache)))
+            self.memo_cache[memo_key] = result
+        return result
 
-    async def _execute_conditional_branch(self, block: ConditionBlock, io_executor, cpu_executor, loop):
+    async def _execute_conditional_branch(self, block: ConditionBlock, spawn, loop):
         """执行条件分支"""
         self.logger.info(f"Executing ConditionBlock: {block.name}")
         inputs = self._gather_inputs(block)
         # self.logger.debug(f"ConditionBlock inputs: {list(inputs.keys())}")
 
-        result = await self._execute_block(block, inputs, io_executor, cpu_executor, loop)
-        self.results[block.name] = result
+        result = await self._execute_block(block, inputs, loop)
+        self.results[block] = result
         self.logger.info(
             f"ConditionBlock {block.name} evaluation result: {result['condition_result']}"
         )
 
-        next_blocks = self.execution_graph[block]
+        then_block, else_block = self._condition_branches[block]
         if result["condition_result"]:
-            # self.logger.debug(f"Taking THEN branch: {next_blocks[0].name}")
-            await self._execute_nodes([next_blocks[0]], io_executor, cpu_executor, loop)
-        elif len(next_blocks) > 1:
-            # self.logger.debug(f"Taking ELSE branch: {next_blocks[1].name}")
-            await self._execute_nodes([next_blocks[1]], io_executor, cpu_executor, loop)
+            if then_block is not None:
+                # self.logger.debug(f"Taking THEN branch: {then_block.name}")
+                self._pending_preds[then_block] = 0
+                spawn(then_block)
+        elif else_block is not None:
+            # self.logger.debug(f"Taking ELSE branch: {else_block.name}")
+            self._pending_preds[else_block] = 0
+            spawn(else_block)
         else:
             # self.logger.debug("No ELSE branch available")
             pass
 
-    async def _execute_loop(self, block: LoopBlock, io_executor, cpu_executor, loop):
+    def _loop_variant_inputs(self, block: LoopBlock) -> list:
+        """找出来源位于循环体内、每轮迭代后需要重新读取的输入连线"""
+        body_blocks: set[Block] = set()
+        stack = list(self.execution_graph[block])
+        while stack:
+            current = stack.pop()
+            if current in body_blocks or current is block:
+                continue
+            body_blocks.add(current)
+            stack.extend(self.execution_graph[current])
+        return [
+            (input_name, wire)
+            for input_name, wire in self._input_wire_map.get(block, {}).items()
+            if wire.source_block in body_blocks
+        ]
+
+    async def _execute_loop(self, block: LoopBlock, spawn, loop):
         """执行循环"""
-        self.logger.info(f"Starting LoopBlock: {block.name}")
+        log_info = self.logger.info
+        log_info(f"Starting LoopBlock: {block.name}")
         iteration = 0
 
+        # 输入字典只收集一次并跨迭代复用，每轮仅就地刷新循环体内产生的值
+        inputs = self._gather_inputs(block)
+        variant_inputs = self._loop_variant_inputs(block)
+
         while True:
             iteration += 1
             # self.logger.debug(f"LoopBlock {block.name} iteration #{iteration}")
-            inputs = self._gather_inputs(block)
-            # self.logger.debug(f"LoopBlock inputs: {list(inputs.keys())}")
-
-            result = await self._execute_block(block, inputs, io_executor, cpu_executor, loop)
-            self.results[block.name] = result
-            self.logger.info(
+            if iteration > 1:
+                for input_name, wire in variant_inputs:
+                    source_results = self.results.get(wire.source_block)
+                    if source_results is not None and wire.source_output in source_results:
+                        inputs[input_name] = source_results[wire.source_output]
+
+            result = await self._execute_block(block, inputs, loop)
+            self.results[block] = result
+            log_info(
                 f"LoopBlock {block.name} continuation check: {result['should_continue']}"
             )
 
             if not result["should_continue"]:
-                self.logger.info(
+                log_info(
                     f"Exiting LoopBlock {block.name} after {iteration} iterations"
                 )
                 break
 
-            # self.logger.debug(f"Executing loop body: {self.execution_graph[block][0].name}")
+            # 循环体必须在下一轮条件判断前执行完毕，所以这里单独等待一个子调度
             loop_body = self.execution_graph[block][0]
-            await self._execute_nodes([loop_body], io_executor, cpu_executor, loop)
+            self._pending_preds[loop_body] = 0
+            await self._execute_nodes([loop_body], loop)
 
-    async def _execute_normal_block(self, block: Block, io_executor, cpu_executor, loop):
+    async def _execute_normal_block(self, block: Block, spawn, loop):
         """执行普通块"""
         # self.logger.debug(f"Evaluating Block: {block.name}")
-        futures = []
-
-        if self._can_execute(block):
-            inputs = self._gather_inputs(block)
-            self.logger.info(f"Executing Block: {block.name}")
-            # self.logger.debug(f"Input parameters: {list(inputs.keys())}")
-
-            future = asyncio.create_task(self._execute_block(block, inputs, io_executor, cpu_executor, loop))
-            futures.append((future, block))
-        else:
+        if (
+            block.name in self._in_flight
+            or self._pending_preds.get(block, 0) > 0
+            or not self._can_execute(block)
+        ):
             # self.logger.debug(f"Block {block.name} dependencies not met, skipping execution")
             return
 
-        # 等待所有并行任务完成
-        for future, block in futures:
-            try:
-                result = await future
-                self.results[block.name] = result
-                self.metrics.completed += 1
-                metrics_registry.inc("workflow_blocks_total")
-                self.logger.info(f"Block [{block.name}] executed successfully")
-                if result:
-                    # self.logger.debug(f"Execution result keys: {list(result.keys())}")
-                    pass
-                next_blocks = self.execution_graph[block]
-                if next_blocks:
-                    # self.logger.debug(f"Propagating to next blocks: {[b.name for b in next_blocks]}")
-                    await self._execute_nodes(next_blocks, io_executor, cpu_executor, loop)
-                else:
-                    # self.logger.debug(f"Block {block.name} is terminal node")
-                    pass
-            except BlockExecutionFailedException as e:
-                self.metrics.failed += 1
-                metrics_registry.inc("workflow_blocks_failed_total")
-                raise e
-            except Exception as e:
-                self.metrics.failed += 1
-                metrics_registry.inc("workflow_blocks_failed_total")
-                raise BlockExecutionFailedException(f"Block {block.name} execution failed: {e}") from e
+        # 在第一个 await 之前认领该块，避免多个前驱同时把它调度两次
+        self._in_flight.add(block.name)
+        inputs = self._gather_inputs(block)
+        log_info = self.logger.info
+        inc = metrics_registry.inc
+        log_info(f"Executing Block: {block.name}")
+        # self.logger.debug(f"Input parameters: {list(inputs.keys())}")
+
+        try:
+            result = await self._execute_block(block, inputs, loop)
+            self.results[block] = result
+            self.metrics.inc_completed()
+            inc("workflow_blocks_total")
+            log_info(f"Block [{block.name}] executed successfully")
+            next_blocks = self.execution_graph[block]
+            if next_blocks:
+                # self.logger.debug(f"Propagating to next blocks: {[b.name for b in next_blocks]}")
+                # 当前块完成，每个不同的后继各扣减一个待完成前驱
+                for next_block in set(next_blocks):
+                    remaining = self._pending_preds.get(next_block, 0)
+                    if remaining > 0:
+                        self._pending_preds[next_block] = remaining - 1
+                for next_block in next_blocks:
+                    spawn(next_block)
+            else:
+                # self.logger.debug(f"Block {block.name} is terminal node")
+                pass
+        except BlockExecutionFailedException as e:
+            self.metrics.inc_failed()
+            inc("workflow_blocks_failed_total")
+            raise e
+        except Exception as e:
+            self.metrics.inc_failed()
+            inc("workflow_blocks_failed_total")
+            raise BlockExecutionFailedException(f"Block {block.name} execution failed: {e}") from e
+        finally:
+            self._in_flight.discard(block.name)
 
     def _can_execute(self, block: Block) -> bool:
         """检查节点是否可以执行"""
         # self.logger.debug(f"Checking execution readiness for Block: {block.name}")
 
         # 如果块已经执行过，直接返回False
-        if block.name in self.results:
+        if block in self.results:
             # self.logger.debug(f"Block {block.name} has already been executed")
             return False
 
-        # 获取所有直接前置blocks
-        predecessor_blocks = set()
-        for wire in self.workflow.wires:
-            if wire.target_block == block:
-                predecessor_blocks.add(wire.source_block)
+        results = self.results
 
         # 确保所有前置blocks都已执行完成
-        for pred_block in predecessor_blocks:
-            if pred_block.name not in self.results:
+        for pred_block in self._predecessors.get(block, ()):
+            if pred_block not in results:
                 # self.logger.debug(f"Predecessor block {pred_block.name} not yet executed")
                 return False
 
         # 验证所有输入是否都能从正确的前置block获取
-        for input_name in block.inputs:
+        block_inputs = block.inputs
+        input_wires = self._input_wire_map.get(block, {})
+        for input_name in block_inputs:
             input_satisfied = False
-            for wire in self.workflow.wires:
-                if (
-                    wire.target_block == block
-                    and wire.target_input == input_name
-                    and wire.source_block.name in self.results
-                    and wire.source_output in self.results[wire.source_block.name]
-                ):
-                    self.logger.debug(f"Input [{block.name}.{input_name}] satisfied by [{wire.source_block.name}.{wire.source_output}] with value {self.results[wire.source_block.name][wire.source_output]}")
-                    input_satisfied = True
-                    break
+            wire = input_wires.get(input_name)
+            if (
+                wire is not None
+                and wire.source_block in results
+                and wire.source_output in results[wire.source_block]
+            ):
+                self.logger.debug(f"Input [{block.name}.{input_name}] satisfied by [{wire.source_block.name}.{wire.source_output}] with value {results[wire.source_block][wire.source_output]}")
+                input_satisfied = True
 
             # 如果输入没有被满足，并且输入不是可空的，则返回False
-            if not input_satisfied and not block.inputs[input_name].nullable:
+            if not input_satisfied and not block_inputs[input_name].nullable:
                 self.logger.info(f"Input [{block.name}.{input_name}] not satisfied")
                 return False
         self.logger.debug(f"All inputs satisfied and predecessors completed for block {block.name}")
@@ -302,19 +588,16 @@ class WorkflowExecutor:
         """收集节点的输入数据"""
         # self.logger.debug(f"Gathering inputs for Block: {block.name}")
         inputs = {}
-
-        # 创建输入名称到wire的映射
-        input_wire_map = {}
-        for wire in self.workflow.wires:
-            if wire.target_block == block:
-                input_wire_map[wire.target_input] = wire
+        results = self.results
+        block_inputs = block.inputs
+        input_wire_map = self._input_wire_map.get(block, {})
 
         # 根据wire的连接关系收集输入
-        for input_name in block.inputs:
-            if input_name in input_wire_map:
-                wire = input_wire_map[input_name]
-                if wire.source_block.name in self.results and wire.source_output in self.results[wire.source_block.name]:
-                    inputs[input_name] = self.results[wire.source_block.name][
+        for input_name in block_inputs:
+            wire = input_wire_map.get(input_name)
+            if wire is not None:
+                if wire.source_block in results and wire.source_output in results[wire.source_block]:
+                    inputs[input_name] = results[wire.source_block][
                         wire.source_output
                     ]
                     # self.logger.debug(f"Resolved input {input_name} from {wire.source_block.name}.{wire.source_output}")
@@ -322,7 +605,7 @@ class WorkflowExecutor:
                     raise BlockExecutionFailedException(
                         f"Current block {block.name} depends on source block {wire.source_block.name} not executed for input {input_name}"
                     )
-            elif not block.inputs[input_name].nullable:
+            elif not block_inputs[input_name].nullable:
                 raise BlockExecutionFailedException(
                     f"Missing wire connection for required input {input_name} in block {block.name}"
                 )
@@ -7,14 +7,25 @@ from huapir.workflow.core.block import Block
 
 class WorkflowConfig(BaseModel):
     max_execution_time: int = 3600
+    # 是否对标记了 memoizable 的块启用结果缓存
+    enable_memoization: bool = False
 
 class Workflow:
     def __init__(self, name: str, blocks: list["Block"], wires: list["Wire"], id: Optional[str] = None, config: Optional[WorkflowConfig] = None):
         self.name = name
-        self.blocks = blocks
-        self.wires = wires
+        # 冻结为元组：工作流一旦构建即视为不可变，结构调整请通过 WorkflowBuilder 重新构建
+        self.blocks = tuple(blocks)
+        self.wires = tuple(wires)
         self.id = id
         self.config = config or WorkflowConfig()
+        # 已编译的执行图缓存，由 WorkflowExecutor 填充；结构变更时通过版本号失效
+        self._compiled_graph = None
+        self._graph_version = 0
+        self._compiled_graph_version = -1
+
+    def invalidate_graph_cache(self):
+        """blocks 或 wires 发生变化后调用，使缓存的执行图失效"""
+        self._graph_version += 1
 
 
 class Wire:
@@ -1,8 +1,10 @@
+import functools
 import importlib
-import random
-import string
+import sys
 import warnings
+from collections import deque
 from dataclasses import dataclass, field
+from types import MappingProxyType
 from typing import Any, Callable, Dict, Optional, Tuple, Type, Union
 
 from ruamel.yaml import YAML
@@ -14,6 +16,33 @@ from huapir.workflow.core.block.registry import BlockRegistry
 from .base import Wire, Workflow, WorkflowConfig
 
 
+@functools.lru_cache(maxsize=None)
+def _cached_import(module_path: str, class_name: str) -> Type[Block]:
+    """按 (模块路径, 类名) 缓存动态导入结果，先查 sys.modules 再回退 import_module"""
+    module = sys.modules.get(module_path)
+    if module is None:
+        module = importlib.import_module(module_path)
+    return getattr(module, class_name)
+
+
+# 模块级共享的 YAML 读写器，免去每次 save/load 都重新构造并配置解析器
+_YAML_DUMPER = YAML()
+_YAML_DUMPER.indent(mapping=2, sequence=4, offset=2)
+_YAML_DUMPER.width = 4096
+_YAML_LOADER = YAML(typ="safe")
+
+# 各 block 类输出表的只读共享代理，控制流块直接引用而不是每次拷贝一份
+_OUTPUTS_PROXY_CACHE: dict[type, MappingProxyType] = {}
+
+
+def _frozen_outputs(block_class: Type[Block]) -> MappingProxyType:
+    proxy = _OUTPUTS_PROXY_CACHE.get(block_class)
+    if proxy is None:
+        proxy = MappingProxyType(block_class.outputs)
+        _OUTPUTS_PROXY_CACHE[block_class] = proxy
+    return proxy
+
+
 def get_block_class(type_name: str, registry: BlockRegistry) -> Type[Block]:
     if type_name.startswith("!!"):
         warnings.warn(
@@ -21,15 +50,15 @@ def get_block_class(type_name: str, registry: BlockRegistry) -> Type[Block]:
             UserWarning,
         )
         module_path, class_name = type_name[2:].rsplit(".", 1)
-        module = importlib.import_module(module_path)
-        return getattr(module, class_name)
+        return _cached_import(module_path, class_name)
 
     block_class = registry.get(type_name)
     if block_class is None:
         raise ValueError(f"Block type {type_name} not found in registry")
     return block_class
 
-@dataclass
+# slots=True 去掉每个实例的 __dict__，大型工作流的节点与规格对象数量可观
+@dataclass(slots=True)
 class BlockSpec:
     """Block 规格的数据类，用于统一处理 block 的创建参数"""
 
@@ -43,7 +72,7 @@ class BlockSpec:
             self.wire_from = [self.wire_from]
 
 
-@dataclass
+@dataclass(slots=True)
 class Node:
     spec: BlockSpec
     name: str
@@ -183,17 +212,24 @@ class WorkflowBuilder:
         self.nodes_by_name: dict[str, Node] = {}
         self.wire_specs: list[Tuple[str, str, str, str]] = []  # (source_name, source_output, target_name, target_input)
         self.config = WorkflowConfig()
+        # 每个基础名称的自增计数器，用于生成确定且唯一的块名称
+        self._name_counters: dict[str, int] = {}
+        # 每个目标节点已被连接的输入端口，随连线增量维护，避免每次全量扫描 wire_specs
+        self._connected_inputs_by_target: dict[str, set[str]] = {}
+        # 按源/目标节点名的连线二级索引，与 wire_specs 一同由 _append_wire 维护
+        self._wires_by_source: dict[str, list[Tuple[str, str, str, str]]] = {}
+        self._wires_by_target: dict[str, list[Tuple[str, str, str, str]]] = {}
 
     def _generate_unique_name(self, base_name: str) -> str:
         """生成唯一的块名称"""
-        while True:
-            # 生成6位随机字符串（数字和字母的组合）
-            suffix = "".join(
-                random.choices(string.ascii_lowercase + string.digits, k=6)
-            )
-            name = f"{base_name}_{suffix}"
-            if name not in self.nodes_by_name:
-                return name
+        n = self._name_counters.get(base_name, 0) + 1
+        name = f"{base_name}_{n}"
+        # 仅当用户手动指定的名称恰好占用了该编号时才会继续递增
+        while name in self.nodes_by_name:
+            n += 1
+            name = f"{base_name}_{n}"
+        self._name_counters[base_name] = n
+        return name
 
     def _parse_block_spec(self, block_spec: Union[Type[Block], tuple]) -> BlockSpec:
         """解析 block 规格，统一处理各种输入格式"""
@@ -220,8 +256,8 @@ class WorkflowBuilder:
 
     def _get_available_inputs(self, node: Node) -> list[str]:
         """获取节点未被连接的输入端口"""
-        connected_inputs = {wire[3] for wire in self.wire_specs if wire[2] == node.name}
-        return [input_name for input_name in node.spec.block_class.inputs.keys() 
+        connected_inputs = self._connected_inputs_by_target.get(node.name, ())
+        return [input_name for input_name in node.spec.block_class.inputs.keys()
                 if input_name not in connected_inputs]
 
     def _find_matching_ports(
@@ -237,16 +273,18 @@ class WorkflowBuilder:
         """
         matches: list[Tuple[str, str]] = []
         source_outputs = source_node.spec.block_class.outputs
-        target_inputs = {name: target_node.spec.block_class.inputs[name] 
-                        for name in available_inputs}
+        target_inputs = target_node.spec.block_class.inputs
+
+        # 可用输入按数据类型分桶，配对从 O(输出×输入) 降到 O(输出+输入)
+        buckets: dict[Any, deque] = {}
+        for in_name in available_inputs:
+            buckets.setdefault(target_inputs[in_name].data_type, deque()).append(in_name)
 
         for out_name, output in source_outputs.items():
-            for in_name, input in target_inputs.items():
-                if output.data_type == input.data_type:
-                    matches.append((out_name, in_name))
-                    # 一旦找到匹配就从可用输入中移除
-                    target_inputs.pop(in_name)
-                    break
+            bucket = buckets.get(output.data_type)
+            if bucket:
+                # 一旦找到匹配就从可用输入中移除
+                matches.append((out_name, bucket.popleft()))
 
         return matches
 
@@ -263,6 +301,19 @@ class WorkflowBuilder:
         if target_node is None:
             target_node = self.nodes_by_name[target_name]
 
+        # 1 出 1 入是 .chain(...) 的绝大多数场景，直接配对省去可用端口收集和分桶匹配
+        source_outputs = source_node.spec.block_class.outputs
+        target_inputs = target_node.spec.block_class.inputs
+        if len(source_outputs) == 1 and len(target_inputs) == 1:
+            (out_name, output), = source_outputs.items()
+            (in_name, input_), = target_inputs.items()
+            if (
+                output.data_type == input_.data_type
+                and in_name not in self._connected_inputs_by_target.get(target_name, ())
+            ):
+                self._append_wire(source_name, out_name, target_name, in_name)
+            return
+
         # 获取目标节点的可用输入端口
         available_inputs = self._get_available_inputs(target_node)
         if not available_inputs:
@@ -272,7 +323,21 @@ class WorkflowBuilder:
         matches = self._find_matching_ports(source_node, target_node, available_inputs)
         # 存储匹配的连接
         for source_output, target_input in matches:
-            self.wire_specs.append((source_name, source_output, target_name, target_input))
+            self._append_wire(source_name, source_output, target_name, target_input)
+
+    def _append_wire(
+        self,
+        source_name: str,
+        source_output: str,
+        target_name: str,
+        target_input: str,
+    ):
+        """追加一条连线，并同步维护按源、按目标与已连接输入的索引"""
+        wire = (source_name, source_output, target_name, target_input)
+        self.wire_specs.append(wire)
+        self._wires_by_source.setdefault(source_name, []).append(wire)
+        self._wires_by_target.setdefault(target_name, []).append(wire)
+        self._connected_inputs_by_target.setdefault(target_name, set()).add(target_input)
 
     def _create_node(self, spec: BlockSpec, is_parallel: bool = False) -> Node:
         """创建一个新的节点，但不实例化 Block"""
@@ -437,9 +502,7 @@ class WorkflowBuilder:
     def build(self, container: DependencyContainer) -> Workflow:
         """构建工作流，在此阶段实例化所有 Block 并创建 Wire"""
         blocks: list[Block] = []
-        wires: list[Wire] = []
         name_to_block: dict[str, Block] = {}
-        name_to_node: dict[str, Node] = {}
 
         # 首先实例化所有 Block
         for node in self.nodes:
@@ -448,24 +511,29 @@ class WorkflowBuilder:
                 if node.is_conditional or node.is_loop:
                     prev_node = node.parent
                     if prev_node and prev_node.spec.block_class:
-                        node.spec.kwargs["outputs"] = prev_node.spec.block_class.outputs.copy()
-                
+                        node.spec.kwargs["outputs"] = _frozen_outputs(prev_node.spec.block_class)
+
                 block = node.spec.block_class(**node.spec.kwargs)
                 if node.name:
                     block.name = node.name
                 block.container = container
+                # 定义了 _warmup 的块（如使用 @jit_block 的数值块）在构建期预编译，
+                # 把首次调用的 JIT 停顿挪到 build 阶段
+                warmup = getattr(block, "_warmup", None)
+                if warmup is not None:
+                    warmup()
                 blocks.append(block)
                 name_to_block[node.name] = block
-                name_to_node[node.name] = node
             except Exception as e:
                 raise ValueError(f"Failed to create block {node.spec.block_class.__name__}: {e}")
 
-        # 然后创建所有 Wire
-        for source_name, source_output, target_name, target_input in self.wire_specs:
-            source_block = name_to_block.get(source_name)
-            target_block = name_to_block.get(target_name)
-            if source_block and target_block:
-                wires.append(Wire(source_block, source_output, target_block, target_input))
+        # 连线两端必然是上面刚构建的节点，直接索引即可；Wire 提为局部变量省去全局查找
+        wire_cls = Wire
+        wires = [
+            wire_cls(name_to_block[source_name], source_output,
+                     name_to_block[target_name], target_input)
+            for source_name, source_output, target_name, target_input in self.wire_specs
+        ]
 
         return Workflow(name=self.name, blocks=blocks, wires=wires, id=self.id, config=self.config)
     
@@ -481,7 +549,7 @@ class WorkflowBuilder:
         target_input: str,
     ):
         """强制存储特定的连接规格"""
-        self.wire_specs.append((source_name, source_output, target_name, target_input))
+        self._append_wire(source_name, source_output, target_name, target_input)
 
     def _find_parallel_nodes(self, start_node: Node) -> list[Node]:
         """查找所有并行节点"""
@@ -504,9 +572,6 @@ class WorkflowBuilder:
     def save_to_yaml(self, file_path: str, container: DependencyContainer):
         """将工作流保存为 YAML 格式"""
         registry: BlockRegistry = container.resolve(BlockRegistry)
-        yaml = YAML()
-        yaml.indent(mapping=2, sequence=4, offset=2)
-        yaml.width = 4096
         workflow_data: dict[str, Any] = {
             "name": self.name,
             "description": self.description,
@@ -514,9 +579,18 @@ class WorkflowBuilder:
             "config": self.config.model_dump(),
         }
 
+        # 连线索引已随 _append_wire 维护，类型名按 block 类缓存，序列化时全部 O(1) 查表
+        wires_by_source = self._wires_by_source
+        type_name_cache: dict[Type[Block], str] = {}
+
         def serialize_node(node: Node) -> dict:
+            block_class = node.spec.block_class
+            type_name = type_name_cache.get(block_class)
+            if type_name is None:
+                type_name = registry.get_block_type_name(block_class)
+                type_name_cache[block_class] = type_name
             block_data: dict[str, Any] = {
-                "type": registry.get_block_type_name(node.spec.block_class),
+                "type": type_name,
                 "name": node.name,
                 "params": node.spec.kwargs,
                 "position": node.position,
@@ -527,27 +601,19 @@ class WorkflowBuilder:
 
             # 添加连接信息
             connected_to: list[dict[str, Any]] = []
-            for wire in self.wire_specs:
-                if wire[0] == node.name:
-                    # 使用 block.name 查找目标节点
-                    target_node = next(
-                        (
-                            n
-                            for n in self.nodes_by_name.values()
-                            if n.name == wire[2]
-                        ),
-                        None,
+            for wire in wires_by_source.get(node.name, ()):
+                # nodes_by_name 本身就以 block.name 为键，直接查表
+                target_node = self.nodes_by_name.get(wire[2])
+                if target_node:  # 只在找到目标节点时添加连接
+                    connected_to.append(
+                        {
+                            "target": target_node.name,
+                            "mapping": {
+                                "from": wire[1],
+                                "to": wire[3],
+                            },
+                        }
                     )
-                    if target_node:  # 只在找到目标节点时添加连接
-                        connected_to.append(
-                            {
-                                "target": target_node.name,
-                                "mapping": {
-                                    "from": wire[1],
-                                    "to": wire[3],
-                                },
-                            }
-                        )
             if connected_to:
                 block_data["connected_to"] = connected_to
             return block_data
@@ -558,7 +624,7 @@ class WorkflowBuilder:
 
         # 保存到文件
         with open(file_path, "w", encoding="utf-8") as f:
-            yaml.dump(workflow_data, f)
+            _YAML_DUMPER.dump(workflow_data, f)
 
         return self
 
@@ -575,9 +641,8 @@ class WorkflowBuilder:
         Returns:
             WorkflowBuilder 实例
         """
-        yaml = YAML(typ="safe")
         with open(file_path, "r", encoding="utf-8") as f:
-            workflow_data: dict[str, Any] = yaml.load(f)
+            workflow_data: dict[str, Any] = _YAML_LOADER.load(f)
 
         builder: WorkflowBuilder = cls(workflow_data["name"])
         builder.config = WorkflowConfig.model_validate(workflow_data.get("config", {}))
@@ -604,6 +669,9 @@ class WorkflowBuilder:
 
         # 第二遍：建立连接
         builder.wire_specs = []
+        builder._connected_inputs_by_target = {}
+        builder._wires_by_source = {}
+        builder._wires_by_target = {}
         for block_data in workflow_data["blocks"]:
             if "connected_to" in block_data:
                 source_node = builder.nodes_by_name[block_data["name"]]
@@ -1,4 +1,5 @@
 import asyncio
+import threading
 from typing import Any, Dict, Optional
 
 from huapir.im.adapter import IMAdapter, UserProfileAdapter
@@ -10,6 +11,9 @@ from huapir.workflow.core.block.input_output import Input, Output
 
 
 class QueryUserProfileBlock(Block):
+    # 每个工作线程复用自己的事件循环，免去 asyncio.run 每次新建并销毁循环的固定开销
+    _thread_local = threading.local()
+
     def __init__(self, container: DependencyContainer):
         inputs = {
             "chat_sender": Input(
@@ -23,7 +27,15 @@ class QueryUserProfileBlock(Block):
         super().__init__("query_user_profile", inputs, outputs)
         self.container = container
 
-    def execute(
+    @classmethod
+    def _get_thread_loop(cls) -> asyncio.AbstractEventLoop:
+        loop = getattr(cls._thread_local, "loop", None)
+        if loop is None or loop.is_closed():
+            loop = asyncio.new_event_loop()
+            cls._thread_local.loop = loop
+        return loop
+
+    async def execute_async(
         self, chat_sender: ChatSender, im_adapter: Optional[IMAdapter] = None
     ) -> dict[str, Any]:
         # 如果没有提供 im_adapter，则从容器中获取默认的
@@ -36,7 +48,15 @@ class QueryUserProfileBlock(Block):
                 f"IM Adapter {type(im_adapter)} does not support user profile querying"
             )
 
-        # 同步调用异步方法（在工作流执行器中会被正确处理）
-        profile = asyncio.run(im_adapter.query_user_profile(chat_sender))  # type: ignore
+        profile = await im_adapter.query_user_profile(chat_sender)  # type: ignore
 
         return {"profile": profile}
+
+    def execute(
+        self, chat_sender: ChatSender, im_adapter: Optional[IMAdapter] = None
+    ) -> dict[str, Any]:
+        # 执行器在工作线程中调用本方法，线程内没有运行中的事件循环，
+        # 用线程私有的常驻循环代替 asyncio.run
+        return self._get_thread_loop().run_until_complete(
+            self.execute_async(chat_sender, im_adapter)
+        )
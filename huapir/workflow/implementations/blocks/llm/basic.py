@@ -17,13 +17,15 @@ class LLMResponseToText(Block):
     outputs = {"text": Output("text", "纯文本", str, "纯文本")}
 
     def execute(self, response: LLMChatResponse) -> dict[str, Any]:
-        content = ""
-        if response.message:
-            for part in response.message.content:
-                if part.type == "text":
-                    content = content + part.text
-                elif part.type == "image":
-                    content = content + f"<media_msg id={part.media_id} />"
-
-        return {"text": content}
+        if not response.message:
+            return {"text": ""}
+        # 先收集片段再一次性 join，避免逐段拼接字符串的反复拷贝
+        parts: list[str] = []
+        for part in response.message.content:
+            if part.type == "text":
+                parts.append(part.text)
+            elif part.type == "image":
+                parts.append(f"<media_msg id={part.media_id} />")
+
+        return {"text": "".join(parts)}
 
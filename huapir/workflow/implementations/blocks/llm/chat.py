@@ -1,16 +1,22 @@
 import asyncio
 import re
 from datetime import datetime
-from typing import Annotated, Any, Dict, Optional
+from typing import Annotated, Any, Dict, Iterable, Iterator, Optional
 
 from huapir.im.message import ImageMessage, IMMessage, MessageElement, TextMessage
 from huapir.im.sender import ChatSender
 from huapir.ioc.container import DependencyContainer
-from huapir.llm.format import LLMChatMessage, LLMChatTextContent
-from huapir.llm.format.message import LLMChatContentPartType, LLMChatImageContent
+from huapir.llm.format import LLMChatMessage, LLMChatTextContent, tool
+from huapir.llm.format.message import (
+    LLMChatContentPartType,
+    LLMChatImageContent,
+    LLMToolResultContent,
+)
 from huapir.llm.format.request import LLMChatRequest, Tool
 from huapir.llm.format.response import LLMChatResponse
+from huapir.llm.adapter import LLMChatBatchProtocol
 from huapir.llm.llm_manager import LLMManager
+from huapir.llm.response_cache import LLMResponseCache
 from huapir.llm.model_types import LLMAbility, ModelType
 from huapir.logger import get_logger
 from huapir.memory.composes.base import ComposableMessageType
@@ -18,6 +24,16 @@ from huapir.workflow.core.block import Block, Input, Output, ParamMeta
 from huapir.workflow.core.execution.executor import WorkflowExecutor
 
 
+# 变量占位符的模式，模块加载时编译一次
+_VAR_RE = re.compile(r"\{([^}]+)\}")
+# ChatMessageConstructor 内置占位符，单次扫描统一替换
+_FIXED_RE = re.compile(r"\{(current_date_time|user_msg|user_name|user_id|memory_content)\}")
+# 回复分段标记
+_BREAK_RE = re.compile(r"<break>")
+# 变量/属性缺失的哨兵值，单次 getattr 即可区分"不存在"与"值为 None"
+_SENTINEL = object()
+
+
 def model_name_options_provider(container: DependencyContainer, block: Block) -> list[str]:
     llm_manager: LLMManager = container.resolve(LLMManager)
     return sorted(llm_manager.get_supported_models(ModelType.LLM, LLMAbility.TextChat))
@@ -50,33 +66,47 @@ class ChatMessageConstructor(Block):
         :param executor: 工作流执行器实例
         :return: 替换后的文本
         """
+        # 没有占位符的固定提示词直接原样返回，不进正则引擎
+        if "{" not in text:
+            return text
+
+        # 同一变量在文本中多次出现时只查询执行器一次
+        resolved_roots: dict[str, Any] = {}
 
         def replace_var(match):
             var_path = match.group(1).split(".")
             var_name = var_path[0]
 
             # 获取基础变量
-            value = executor.get_variable(var_name, match.group(0))
+            if var_name in resolved_roots:
+                value = resolved_roots[var_name]
+            else:
+                value = executor.get_variable(var_name, _SENTINEL)
+                resolved_roots[var_name] = value
+            if value is _SENTINEL:
+                # 未定义的变量保留原始占位符
+                return match.group(0)
 
             # 如果有属性/键访问
             for attr in var_path[1:]:
                 try:
                     # 尝试字典键访问
-                    if isinstance(value, dict):
+                    if type(value) is dict:
                         value = value.get(attr, match.group(0))
-                    # 尝试对象属性访问
-                    elif hasattr(value, attr):
-                        value = getattr(value, attr)
-                    else:
+                        continue
+                    # 尝试对象属性访问：带默认值的单次 getattr，省去 hasattr 的重复查找
+                    attr_value = getattr(value, attr, _SENTINEL)
+                    if attr_value is _SENTINEL:
                         # 如果无法访问，返回原始占位符
                         return match.group(0)
+                    value = attr_value
                 except Exception:
                     # 任何异常都返回原始占位符
                     return match.group(0)
 
             return str(value)
 
-        return re.sub(r"\{([^}]+)\}", replace_var, text)
+        return _VAR_RE.sub(replace_var, text)
 
     def execute(
         self,
@@ -88,20 +118,30 @@ class ChatMessageConstructor(Block):
         # 获取当前执行器
         executor = self.container.resolve(WorkflowExecutor)
 
-        # 先替换自有的两个变量
+        # 先替换自有的内置变量：一次扫描完成全部替换，
+        # 替换结果中出现的其它占位符也不会被后续轮次误展开
         replacements = {
-            "{current_date_time}": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "{user_msg}": user_msg.content,
-            "{user_name}": user_msg.sender.display_name,
-            "{user_id}": user_msg.sender.user_id
+            "current_date_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "user_msg": user_msg.content,
+            "user_name": user_msg.sender.display_name,
+            "user_id": user_msg.sender.user_id
         }
 
-        if isinstance(memory_content, list) and all(isinstance(item, str) for item in memory_content):
-            replacements["{memory_content}"] = "\n".join(memory_content)
+        # 解析器产出的列表是同质的，看首元素即可分派类型，不必全量扫描两遍
+        memory_is_messages = False
+        if isinstance(memory_content, list):
+            first = memory_content[0] if memory_content else None
+            if first is None or isinstance(first, str):
+                # 空记忆和字符串记忆都走文本替换
+                replacements["memory_content"] = "\n".join(memory_content)
+            elif isinstance(first, LLMChatMessage):
+                memory_is_messages = True
+
+        def replace_fixed(match):
+            return replacements.get(match.group(1), match.group(0))
 
-        for old, new in replacements.items():
-            system_prompt_format = system_prompt_format.replace(old, new)
-            user_prompt_format = user_prompt_format.replace(old, new)
+        system_prompt_format = _FIXED_RE.sub(replace_fixed, system_prompt_format)
+        user_prompt_format = _FIXED_RE.sub(replace_fixed, user_prompt_format)
 
         # 再替换其他变量
         system_prompt = self.substitute_variables(
@@ -110,16 +150,16 @@ class ChatMessageConstructor(Block):
 
         content: list[LLMChatContentPartType] = [
             LLMChatTextContent(text=user_prompt)]
-        # 添加图片内容
-        for image in user_msg.images or []:
-            content.append(LLMChatImageContent(media_id=image.media_id))
+        # 添加图片内容；空回退用 () 而不是 []，避免每次调用都分配一个新列表
+        content.extend(LLMChatImageContent(media_id=image.media_id)
+                       for image in (user_msg.images or ()))
 
         llm_msg = [
             LLMChatMessage(role="system", content=[
                            LLMChatTextContent(text=system_prompt)]),
         ]
 
-        if isinstance(memory_content, list) and all(isinstance(item, LLMChatMessage) for item in memory_content):
+        if memory_is_messages:
             llm_msg.extend(memory_content)  # type: ignore
 
         llm_msg.append(LLMChatMessage(role="user", content=content))
@@ -143,11 +183,24 @@ class ChatCompletion(Block):
                 description="要使用的模型 ID",
                 options_provider=model_name_options_provider),
         ] = None,
+        enable_cache: Annotated[
+            bool,
+            ParamMeta(
+                label="启用响应缓存",
+                description="相同请求直接复用上次的模型响应，适合确定性工作流和调试"),
+        ] = False,
     ):
         self.model_name = model_name
+        self.enable_cache = enable_cache
+        # 已解析的 (model_id, llm)，首次执行时填充
+        self._resolved_model: Optional[tuple] = None
         self.logger = get_logger("ChatCompletionBlock")
 
-    def execute(self, prompt: list[LLMChatMessage]) -> dict[str, Any]:
+    def refresh(self):
+        """模型配置变更后调用，清除已解析的模型缓存"""
+        self._resolved_model = None
+
+    def _resolve_model(self) -> tuple:
         llm_manager = self.container.resolve(LLMManager)
         model_id = self.model_name
         if not model_id:
@@ -165,8 +218,108 @@ class ChatCompletion(Block):
         if not llm:
             raise ValueError(
                 f"LLM {model_id} not found, please check the model name")
+        return model_id, llm
+
+    def _prepare(self, prompt: list[LLMChatMessage]) -> tuple:
+        """解析模型、构造请求并准备响应缓存，同步与异步入口共用"""
+        # 模型解析结果在实例上缓存，重复执行不再查询管理器
+        if self._resolved_model is None:
+            self._resolved_model = self._resolve_model()
+        model_id, llm = self._resolved_model
         req = LLMChatRequest(messages=prompt, model=model_id)
-        return {"resp": llm.chat(req)}
+
+        cache = key = None
+        if self.enable_cache and self.container.has(LLMResponseCache):
+            cache = self.container.resolve(LLMResponseCache)
+            key = cache.make_key(model_id, req)
+        return llm, req, cache, key
+
+    def execute(self, prompt: list[LLMChatMessage]) -> dict[str, Any]:
+        llm, req, cache, key = self._prepare(prompt)
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                self.logger.debug("LLM response cache hit, skipping model call")
+                return {"resp": cached}
+
+        resp = llm.chat(req)
+        if cache is not None:
+            cache.put(key, resp)
+        return {"resp": resp}
+
+    async def execute_async(self, prompt: list[LLMChatMessage]) -> dict[str, Any]:
+        """异步执行入口：执行器会优先调用它，多个相互独立的 LLM 节点
+        因此能在事件循环上并发等待，总耗时从各请求之和降为其中的最大值。
+        后端适配器目前只有阻塞的 chat()，调用放到线程池避免卡住事件循环。
+        """
+        llm, req, cache, key = self._prepare(prompt)
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                self.logger.debug("LLM response cache hit, skipping model call")
+                return {"resp": cached}
+
+        resp = await asyncio.to_thread(llm.chat, req)
+        if cache is not None:
+            cache.put(key, resp)
+        return {"resp": resp}
+
+
+class ChatCompletionBatch(Block):
+    """通过 Batch API 执行对话的块
+
+    适合记忆总结、批量分类等对延迟不敏感的离线工作流：请求进入批处理
+    队列后轮询等待结果，换取约一半的调用成本和更高的速率上限。
+    要求所选模型的后端实现 LLMChatBatchProtocol（如 OpenAI 适配器）。
+    """
+    name = "chat_completion_batch"
+    inputs = {
+        "prompt": Input("prompt", "LLM 对话记录", list[LLMChatMessage], "LLM 对话记录")
+    }
+    outputs = {"resp": Output("resp", "LLM 对话响应", LLMChatResponse, "LLM 对话响应")}
+    container: DependencyContainer
+
+    def __init__(
+        self,
+        model_name: Annotated[
+            str,
+            ParamMeta(
+                label="模型 ID",
+                description="要使用的模型 ID，后端需要支持 Batch API",
+                options_provider=model_name_options_provider),
+        ],
+        completion_window: Annotated[
+            str,
+            ParamMeta(
+                label="完成窗口",
+                description="批处理的最长完成时限，如 24h"),
+        ] = "24h",
+        poll_interval_s: Annotated[
+            int,
+            ParamMeta(
+                label="轮询间隔（秒）",
+                description="查询批处理状态的时间间隔"),
+        ] = 30,
+    ):
+        self.model_name = model_name
+        self.completion_window = completion_window
+        self.poll_interval_s = poll_interval_s
+        self.logger = get_logger("Block.ChatCompletionBatch")
+
+    def execute(self, prompt: list[LLMChatMessage]) -> dict[str, Any]:
+        llm = self.container.resolve(LLMManager).get_llm(self.model_name)
+        if not llm:
+            raise ValueError(
+                f"LLM {self.model_name} not found, please check the model name")
+        if not isinstance(llm, LLMChatBatchProtocol):
+            raise ValueError(
+                f"LLM {self.model_name} does not support batch chat")
+
+        req = LLMChatRequest(messages=prompt, model=self.model_name)
+        self.logger.info(
+            f"Submitting batch request to {self.model_name}, completion window: {self.completion_window}")
+        resp = llm.batch_chat(req, self.completion_window, self.poll_interval_s)
+        return {"resp": resp}
 
 
 class ChatResponseConverter(Block):
@@ -180,10 +333,18 @@ class ChatResponseConverter(Block):
 
         for part in resp.message.content:
             if isinstance(part, LLMChatTextContent):
+                text = part.text
+                # 不含 <break> 的回答（绝大多数情况）直接整段转换
+                if "<break>" not in text:
+                    stripped = text.strip()
+                    if stripped:
+                        message_elements.append(TextMessage(stripped))
+                    continue
                 # 通过 <break> 将回答分为不同的 TextMessage
-                for element in part.text.split("<break>"):
-                    if element.strip():
-                        message_elements.append(TextMessage(element.strip()))
+                for element in _BREAK_RE.split(text):
+                    stripped = element.strip()
+                    if stripped:
+                        message_elements.append(TextMessage(stripped))
             elif isinstance(part, LLMChatImageContent):
                 message_elements.append(ImageMessage(media_id=part.media_id))
         msg = IMMessage(sender=ChatSender.get_bot_sender(),
@@ -191,6 +352,46 @@ class ChatResponseConverter(Block):
         return {"msg": msg}
 
 
+def split_text_by_breaks(chunks: Iterable[str]) -> Iterator[str]:
+    """滚动缓冲切分：每当缓冲区越过一个 <break> 边界就立刻产出该段文本。
+
+    与一次性 split 不同，本函数接收文本分片流，分段在分片到达过程中
+    增量产出，不必等待完整回复；<break> 标记跨分片出现也能正确切分。
+    """
+    buf = ""
+    for chunk in chunks:
+        buf += chunk
+        while "<break>" in buf:
+            head, buf = buf.split("<break>", 1)
+            head = head.strip()
+            if head:
+                yield head
+    tail = buf.strip()
+    if tail:
+        yield tail
+
+
+class StreamingChatResponseConverter(Block):
+    """将流式文本分片转换为 IM 消息
+
+    接受任意字符串分片迭代器，按 <break> 边界增量切分出各条消息。
+    当前内置 LLM 后端尚未暴露分片响应类型，后端支持流式输出后，
+    把分片流接到本块即可获得首条消息提前送达的效果。
+    """
+    name = "streaming_chat_response_converter"
+    inputs = {"chunks": Input("chunks", "文本分片", Iterator[str], "流式返回的文本分片")}
+    outputs = {"msg": Output("msg", "IM 消息", IMMessage, "IM 消息")}
+    container: DependencyContainer
+
+    def execute(self, chunks: Iterator[str]) -> dict[str, Any]:
+        message_elements: list[MessageElement] = [
+            TextMessage(segment) for segment in split_text_by_breaks(chunks)
+        ]
+        msg = IMMessage(sender=ChatSender.get_bot_sender(),
+                        message_elements=message_elements)
+        return {"msg": msg}
+
+
 class ChatCompletionWithTools(Block):
     """
     支持工具调用的LLM对话块
@@ -219,11 +420,38 @@ class ChatCompletionWithTools(Block):
         ParamMeta(
             label="最大迭代次数",
             description="允许调用模型请求的最大次数，在进行最后一次请求时，模型将不允许调用工具")
-    ] = 4):
+    ] = 4,
+        enable_cache: Annotated[
+        bool,
+        ParamMeta(
+            label="启用响应缓存",
+            description="相同请求直接复用上次的模型响应，适合确定性工作流和调试")
+    ] = False):
         self.model_name = model_name
         self.max_iterations = max_iterations
+        self.enable_cache = enable_cache
+        # 已解析的 llm 实例，首次执行时填充
+        self._llm = None
         self.logger = get_logger("Block.ChatCompletionWithTools")
 
+    def refresh(self):
+        """模型配置变更后调用，清除已解析的模型缓存"""
+        self._llm = None
+
+    def _chat(self, llm, request_body: LLMChatRequest) -> LLMChatResponse:
+        """调用模型，启用缓存时按请求内容先查 LLMResponseCache"""
+        if not self.enable_cache or not self.container.has(LLMResponseCache):
+            return llm.chat(request_body)
+        cache = self.container.resolve(LLMResponseCache)
+        key = cache.make_key(self.model_name, request_body)
+        cached = cache.get(key)
+        if cached is not None:
+            self.logger.debug("LLM response cache hit, skipping model call")
+            return cached
+        response = llm.chat(request_body)
+        cache.put(key, response)
+        return response
+
     def execute(self, msg: list[LLMChatMessage], tools: list[Tool]) -> dict[str, Any]:
         if not self.model_name:
             raise ValueError(
@@ -232,45 +460,81 @@ class ChatCompletionWithTools(Block):
             self.logger.info(
                 f"Using  model: {self.model_name} to execute function calling")
 
-        loop = self.container.resolve(asyncio.AbstractEventLoop)
-        llm = self.container.resolve(LLMManager).get_llm(self.model_name)
-        if not llm:
-            raise ValueError(
-                f"LLM {self.model_name} not found, please check the model name")
+        # 模型解析结果在实例上缓存，重复执行不再查询管理器
+        if self._llm is None:
+            self._llm = self.container.resolve(LLMManager).get_llm(self.model_name)
+            if not self._llm:
+                raise ValueError(
+                    f"LLM {self.model_name} not found, please check the model name")
+        llm = self._llm
+
+        # 没有提供工具时不会产生 tool_calls，迭代循环没有意义，直接发起一次普通请求
+        if not tools:
+            request_body = LLMChatRequest.model_construct(
+                messages=msg, model=self.model_name)
+            response = self._chat(llm, request_body)
+            return {"resp": response, "iteration_msgs": []}
 
+        loop = self.container.resolve(asyncio.AbstractEventLoop)
         iteration_msgs: list[LLMChatMessage] = []
         iter_count = 0
+        # 工具列表在迭代期间不变，映射只构建一次
+        tools_mapping = {t.name: t for t in tools}
+        # 完整对话维护在一个列表里增量追加，避免每轮 msg + iteration_msgs 重新拼接
+        all_msgs: list[LLMChatMessage] = list(msg)
         while iter_count < self.max_iterations:
             # 在这里指定llm的model
             self.logger.debug(
                 f"Iteration {iter_count+1} of {self.max_iterations}")
-            request_body = LLMChatRequest(
-                messages=msg + iteration_msgs, model=self.model_name)
-            if tools is not None and len(tools) > 0:
-                request_body.tools = tools
+            # 消息都是已校验过的 LLMChatMessage，model_construct 跳过重复校验
+            request_body = LLMChatRequest.model_construct(
+                messages=all_msgs, model=self.model_name)
+            request_body.tools = tools
 
             # 最后一次迭代不调用工具
             if iter_count == self.max_iterations - 1:
                 request_body.tool_choice = "none"
 
-            tools_mapping = {t.name: t for t in tools}
-
-            response: LLMChatResponse = llm.chat(request_body)
+            response: LLMChatResponse = self._chat(llm, request_body)
             iter_count += 1
             if response.message.tool_calls:
                 iteration_msgs.append(response.message)
+                all_msgs.append(response.message)
                 self.logger.debug("Tool calls found, attempt to invoke tools")
+                # 先把所有工具调用都提交到事件循环并发执行，再按原顺序收集结果，
+                # 一轮多工具的等待时间从各调用延迟之和降为其中的最大值
+                resp_futures = []
                 for tool_call in response.message.tool_calls:
                     actual_tool = tools_mapping.get(tool_call.function.name)
-                    if actual_tool:
-                        self.logger.debug(
-                            f"Invoking tool: {actual_tool.name}({tool_call.function.arguments})")
-                        resp_future = asyncio.run_coroutine_threadsafe(
-                            actual_tool.invokeFunc(tool_call), loop
-                        )
-                        tool_result_msg = LLMChatMessage(
-                            role="tool", content=[resp_future.result()])
-                        iteration_msgs.append(tool_result_msg)
+                    if actual_tool is None:
+                        # 模型请求了不存在的工具：回填一条错误的工具结果而不是静默丢弃，
+                        # 否则下一轮会出现只有 tool_calls 没有对应 tool 回复的对话，
+                        # 很多服务端会直接拒绝这样的请求
+                        self.logger.warning(
+                            f"Tool {tool_call.function.name} not found in tools list, returning error result")
+                        resp_futures.append(LLMToolResultContent(
+                            id=tool_call.id,
+                            name=tool_call.function.name,
+                            content=[tool.TextContent(
+                                text=f"Tool {tool_call.function.name} not available")],
+                            isError=True,
+                        ))
+                        continue
+                    self.logger.debug(
+                        f"Invoking tool: {actual_tool.name}({tool_call.function.arguments})")
+                    resp_futures.append(asyncio.run_coroutine_threadsafe(
+                        actual_tool.invokeFunc(tool_call), loop
+                    ))
+                for resp_future in resp_futures:
+                    # 未知工具的错误结果是现成的，真实调用则等待 future 完成
+                    if isinstance(resp_future, LLMToolResultContent):
+                        result = resp_future
+                    else:
+                        result = resp_future.result()
+                    tool_result_msg = LLMChatMessage(
+                        role="tool", content=[result])
+                    iteration_msgs.append(tool_result_msg)
+                    all_msgs.append(tool_result_msg)
             else:
                 self.logger.debug(
                     "No tool calls found, return response directly")
@@ -1,3 +1,4 @@
+import asyncio
 from base64 import b64decode
 from typing import Annotated, Any, Dict
 
@@ -78,24 +79,38 @@ class MCPToolProvider(Block):
             "tools": built_tools
         }
 
+    async def _register_image(self, item: types.ImageContent) -> tool.MediaContent:
+        """解码并注册单张图片：b64decode 放到线程池，避免大图阻塞事件循环"""
+        data = await asyncio.to_thread(b64decode, item.data)
+        media_type = MediaType.from_mime(item.mimeType)
+        format = item.mimeType.split("/")[1]
+        media_id = await self.container.resolve(MediaManager).register_from_data(
+            data, format=format, media_type=media_type)
+        return tool.MediaContent(
+            media_id=media_id,
+            mime_type=item.mimeType,
+            data=data
+        )
+
     async def _create_tool_result(self, tool_id: str, tool_name: str, content: list[types.TextContent | types.ImageContent | types.EmbeddedResource]) -> LLMToolResultContent:
         """创建工具调用结果"""
-        converted_content: list[tool.TextContent | tool.MediaContent] = []
+        # 文本直接转换；图片的解码和注册并发执行，多图耗时取决于最慢的一张而非总和。
+        # 先用 None 占位，gather 之后按原索引回填，保持结果顺序不变
+        converted_content: list[tool.TextContent | tool.MediaContent | None] = []
+        image_slots: list[int] = []
+        image_tasks: list[asyncio.Task[tool.MediaContent]] = []
         for item in content:
             if isinstance(item, types.TextContent):
                 converted_content.append(tool.TextContent(
                     text=item.text
                 ))
             elif isinstance(item, types.ImageContent):
-                data = b64decode(item.data)
-                media_type = MediaType.from_mime(item.mimeType)
-                format = item.mimeType.split("/")[1]
-                media_id = await self.container.resolve(MediaManager).register_from_data(data, format=format, media_type=media_type)
-                converted_content.append(tool.MediaContent(
-                    media_id=media_id,
-                    mime_type=item.mimeType,
-                    data=data
-                ))
+                image_slots.append(len(converted_content))
+                converted_content.append(None)
+                image_tasks.append(asyncio.create_task(self._register_image(item)))
+        if image_tasks:
+            for slot, media_content in zip(image_slots, await asyncio.gather(*image_tasks)):
+                converted_content[slot] = media_content
         return LLMToolResultContent(
             id=tool_id,
             name=tool_name,
@@ -59,8 +59,12 @@ class ChatMemoryQuery(Block):
         self.scope_type = scope_type
         self.decomposer_name: str = decomposer_name or "default"
         self.extra_identifier = extra_identifier
+        self._resolved = False
 
-    def execute(self, chat_sender: ChatSender) -> dict[str, Any]:
+    def _ensure_resolved(self):
+        """首次执行时解析管理器、作用域与解析器，之后直接复用"""
+        if self._resolved:
+            return
         self.memory_manager = self.container.resolve(MemoryManager)
 
         # 如果没有指定作用域类型，使用配置中的默认值
@@ -68,14 +72,15 @@ class ChatMemoryQuery(Block):
             self.scope_type = self.memory_manager.config.default_scope
 
         # 获取作用域实例
-        scope_registry = self.container.resolve(ScopeRegistry)
-        self.scope = scope_registry.get_scope(self.scope_type)
+        self.scope = self.container.resolve(ScopeRegistry).get_scope(self.scope_type)
 
         # 获取解析器实例
-        decomposer_registry = self.container.resolve(DecomposerRegistry)
-        self.decomposer = decomposer_registry.get_decomposer(
+        self.decomposer = self.container.resolve(DecomposerRegistry).get_decomposer(
             self.decomposer_name)
+        self._resolved = True
 
+    def execute(self, chat_sender: ChatSender) -> dict[str, Any]:
+        self._ensure_resolved()
         entries = self.memory_manager.query(self.scope, chat_sender, self.extra_identifier)
         memory_content = self.decomposer.decompose(entries)
         return {"memory_content": memory_content}
@@ -117,13 +122,12 @@ class ChatMemoryStore(Block):
         self.scope_type = scope_type
         self.logger = get_logger("Block.ChatMemoryStore")
         self.extra_identifier = extra_identifier
+        self._resolved = False
 
-    def execute(
-        self,
-        user_msg: Optional[IMMessage] = None,
-        llm_resp: Optional[LLMChatResponse] = None,
-        middle_steps: Optional[list[ComposableMessageType]] = None,
-    ) -> dict[str, Any]:
+    def _ensure_resolved(self):
+        """首次执行时解析管理器、作用域与组合器，之后直接复用"""
+        if self._resolved:
+            return
         self.memory_manager = self.container.resolve(MemoryManager)
 
         # 如果没有指定作用域类型，使用配置中的默认值
@@ -131,12 +135,19 @@ class ChatMemoryStore(Block):
             self.scope_type = self.memory_manager.config.default_scope
 
         # 获取作用域实例
-        scope_registry = self.container.resolve(ScopeRegistry)
-        self.scope = scope_registry.get_scope(self.scope_type)
+        self.scope = self.container.resolve(ScopeRegistry).get_scope(self.scope_type)
 
         # 获取组合器实例
-        composer_registry = self.container.resolve(ComposerRegistry)
-        self.composer = composer_registry.get_composer("default")
+        self.composer = self.container.resolve(ComposerRegistry).get_composer("default")
+        self._resolved = True
+
+    def execute(
+        self,
+        user_msg: Optional[IMMessage] = None,
+        llm_resp: Optional[LLMChatResponse] = None,
+        middle_steps: Optional[list[ComposableMessageType]] = None,
+    ) -> dict[str, Any]:
+        self._ensure_resolved()
 
         # 存储用户消息和LLM响应
         if user_msg is None:
@@ -25,13 +25,20 @@ class ClearMemory(Block):
         ] = "member",
     ):
         self.scope_type = scope_type
+        self._resolved = False
 
-    def execute(self, chat_sender: ChatSender) -> dict[str, Any]:
+    def _ensure_resolved(self):
+        """首次执行时解析管理器与作用域，之后直接复用"""
+        if self._resolved:
+            return
         self.memory_manager = self.container.resolve(MemoryManager)
 
         # Get scope instance
-        scope_registry = self.container.resolve(ScopeRegistry)
-        self.scope = scope_registry.get_scope(self.scope_type)
+        self.scope = self.container.resolve(ScopeRegistry).get_scope(self.scope_type)
+        self._resolved = True
+
+    def execute(self, chat_sender: ChatSender) -> dict[str, Any]:
+        self._ensure_resolved()
         # Clear memory using the manager's method
         self.memory_manager.clear_memory(self.scope, chat_sender)
         return {
@@ -63,13 +63,14 @@ class TextExtractByRegexBlock(Block):
         self, regex: Annotated[str, ParamMeta(label="正则表达式", description="正则表达式")]
     ):
         self.regex = regex
+        # 表达式不会再变化，构造时编译一次
+        self._regex = re.compile(regex)
 
     def execute(self, text: str) -> dict[str, Any]:
         # 使用正则表达式提取文本
-        regex = re.compile(self.regex)
-        match = regex.search(text)
+        match = self._regex.search(text)
         # 如果匹配到，则返回匹配到的文本，否则返回空字符串
-        if match and len(match.groups()) > 0:
+        if match and match.lastindex:
             return {"text": match.group(1)}
         else:
             return {"text": ""}
@@ -102,38 +103,29 @@ class CodeBlock(Block):
             self.outputs[output_spec["name"]] = Output(output_spec["name"], output_spec["label"], Any, 'user-specified object') # type: ignore
         self.code = code
 
-    def execute(self, **kwargs: Any) -> dict[str, Any]: # 使用 Any 兼容各种输入类型
+        # 定义代码只编译并执行一次：构建期即可发现语法/定义错误，
+        # 执行期直接调用用户函数，不再为每次调用重新 exec
         logger = get_logger("Block.Code")
-
-        exec_globals = globals().copy()
-        exec_locals: dict[str, Any] = {}
-
-        logger.debug(f"Executing code definition:\n{self.code}")
+        logger.debug(f"Compiling code definition:\n{code}")
+        namespace = globals().copy()
         try:
-            exec(self.code, exec_globals, exec_locals)
+            exec(compile(code, "<CodeBlock>", "exec"), namespace)
         except Exception as e:
             logger.error(f"Error during code definition execution: {e}", exc_info=True)
             raise RuntimeError(f"Error in provided code definition: {e}") from e
 
-        if 'execute' not in exec_locals or not callable(exec_locals['execute']):
+        user_execute = namespace.get("execute")
+        if not callable(user_execute):
             raise ValueError("Provided code must define a callable function named 'execute'")
-        
-        exec_locals['__input_kwargs__'] = kwargs
-        exec_globals.update(exec_locals)
-        call_code = "__result__ = execute(**__input_kwargs__)"
+        # 保留命名空间引用，用户代码里的模块级导入和辅助定义对 execute 持续可见
+        self._user_namespace = namespace
+        self._user_execute = user_execute
 
+    def execute(self, **kwargs: Any) -> dict[str, Any]: # 使用 Any 兼容各种输入类型
+        logger = get_logger("Block.Code")
         logger.debug(f"Executing function call: execute(**{list(kwargs.keys())})")
         try:
-            exec(call_code, exec_globals, exec_locals)
+            return self._user_execute(**kwargs)
         except Exception as e:
             logger.error(f"Error during user function 'execute' execution: {e}", exc_info=True)
             raise RuntimeError(f"Error during execution of user function 'execute': {e}") from e
-
-        if '__result__' not in exec_locals:
-             # 如果 exec(call_code) 成功但没有 __result__，说明有内部问题
-             logger.error("Internal error: Result '__result__' not found after executing user code call.")
-             raise RuntimeError("Failed to retrieve result from user code execution.")
-
-        result = exec_locals['__result__']
-
-        return result
@@ -12,7 +12,8 @@ from .game.dice import DiceRoll
 from .game.gacha import GachaSimulator
 from .im.messages import AppendIMMessage, GetIMMessage, IMMessageToText, SendIMMessage, TextToIMMessage
 from .im.states import ToggleEditState
-from .llm.chat import ChatCompletion, ChatCompletionWithTools, ChatMessageConstructor, ChatResponseConverter
+from .llm.chat import (ChatCompletion, ChatCompletionBatch, ChatCompletionWithTools, ChatMessageConstructor,
+                       ChatResponseConverter, StreamingChatResponseConverter)
 from .memory.chat_memory import ChatMemoryQuery, ChatMemoryStore
 from .system.help import GenerateHelp
 
@@ -50,12 +51,19 @@ def register_system_blocks(registry: BlockRegistry):
     )
     registry.register("chat_completion", "internal", ChatCompletion, "LLM: 执行对话")
     registry.register("chat_completion_with_tools", "internal", ChatCompletionWithTools, "LLM: 执行对话并调用工具")
+    registry.register("chat_completion_batch", "internal", ChatCompletionBatch, "LLM: 批处理执行对话")
     registry.register(
         "chat_response_converter",
         "internal",
         ChatResponseConverter,
         "LLM->IM: 转换消息",
     )
+    registry.register(
+        "streaming_chat_response_converter",
+        "internal",
+        StreamingChatResponseConverter,
+        "LLM->IM: 流式转换消息",
+    )
     registry.register("chat_memory_store", "internal", ChatMemoryStore, "LLM: 存储记忆")
     registry.register("llm_response_to_text", "internal", LLMResponseToText, "LLM: 响应转文本")
 